@@ -2,28 +2,125 @@
 Connector identification and lookup logic.
 """
 import re
-import math
-from typing import List, Optional, Tuple
+import heapq
+from functools import lru_cache
+from bisect import bisect_left, bisect_right
+from typing import List, NamedTuple, Optional, Tuple, Union
 from models import TextElement, ConnectionPoint
 
 # Junction configuration: central junction identifier in automotive wiring
 # Convention: PREFIX+2+JUNCTION_ID = destination, JUNCTION_ID+2+PREFIX = source
 JUNCTION_ID = 'FL'  # Front Left junction point
+_DESTINATION_JUNCTION_SUFFIX = f'2{JUNCTION_ID}'  # MH2FL, FTL2FL
+_SOURCE_JUNCTION_PREFIX = f'{JUNCTION_ID}2'  # FL2MH, FL2FTL
+
+# Text classification codes returned by classify_text()
+TEXT_OTHER = 0
+TEXT_CONNECTOR = 1  # MH3202C, MAIN202 (XR-), shielded pair "A (XR-)\nB (XR+)"
+TEXT_GROUND = 2     # G22B(m), G05(z), G22_B(m)
+TEXT_SPLICE = 3     # SP001, SP_CUSTOM_001
+TEXT_WIRE = 4       # 0.35,GY/PU
+
+# Combined label pattern: one alternation, dispatched on match.lastgroup.
+# Branch order matters: SP-prefixed and GND labels are never connectors.
+_RE_LABEL = re.compile(
+    # Splice points: SP001, and custom IDs for unlabeled splices (SP_CUSTOM_001)
+    r'(?P<splice>SP\d+$|SP_CUSTOM_)'
+    # Other SP* text, and GND labels (GND, GND1, ...) - descriptions, not connectors
+    r'|(?P<other>SP|GND\d*$)'
+    # Wire specs: 0.35,GY/PU or 0.35, GY/PU
+    r'|(?P<wire>[\d.]+,\s*[A-Z]{2,}(?:/[A-Z]{2,})?$)'
+    # Standard connector (MH3202C, MAIN557, RRSS380_A), optionally with option (MAIN202 (XR-))
+    r'|(?P<connector>[A-Z]{2,4}\d{1,5}[A-Z_]{0,5}(?:\s+\([A-Z]+[+-]\))?$)'
+    # Ground points: G22B(m), G05(z), G22_B(m)
+    r'|(?P<ground>[A-Z_]+\d+[A-Z_]*\([a-z]\)$)'
+)
+# Shielded pair: exactly two connector lines, each optionally with option.
+# Whitespace inside a line excludes '\n' so a line never spans the separator.
+_CONNECTOR_LINE = r'[A-Z]{2,4}\d{1,5}[A-Z_]{0,5}(?:[^\S\n]+\([A-Z]+[+-]\))?'
+_RE_SHIELDED_PAIR = re.compile(_CONNECTOR_LINE + r'\n' + _CONNECTOR_LINE + r'\Z')
+_LABEL_KINDS = {
+    'splice': TEXT_SPLICE,
+    'other': TEXT_OTHER,
+    'wire': TEXT_WIRE,
+    'connector': TEXT_CONNECTOR,
+    'ground': TEXT_GROUND,
+}
+
+# Dash-separated pin numbers: 3-1, 4-2
+_RE_PIN_DASH = re.compile(r'^\d+-\d+$')
+
+# Size of the classify_text() and is_pin_number() memos. Besides building TextIndex,
+# the is_* helpers are called on the same connector ids and labels many times;
+# the bound keeps long batch runs from growing the memos without limit.
+_LABEL_CACHE_SIZE = 4096
 
 
 def is_destination_junction(connector_id: str) -> bool:
     """Check if junction connector is a destination (*2JUNCTION_ID pattern)."""
-    return connector_id.endswith(f'2{JUNCTION_ID}')
+    return connector_id.endswith(_DESTINATION_JUNCTION_SUFFIX)
 
 
 def is_source_junction(connector_id: str) -> bool:
     """Check if junction connector is a source (JUNCTION_ID2* pattern)."""
-    return connector_id.startswith(f'{JUNCTION_ID}2')
+    return connector_id.startswith(_SOURCE_JUNCTION_PREFIX)
 
 
 def is_junction_connector(connector_id: str) -> bool:
     """Check if connector is a junction (contains JUNCTION_ID with '2')."""
-    return f'2{JUNCTION_ID}' in connector_id or f'{JUNCTION_ID}2' in connector_id
+    return _DESTINATION_JUNCTION_SUFFIX in connector_id or _SOURCE_JUNCTION_PREFIX in connector_id
+
+
+def is_junction_pair(conn1: str, conn2: str) -> bool:
+    """
+    Check if two connectors are junction pairs (PREFIX1+2+PREFIX2 ↔ PREFIX2+2+PREFIX1).
+
+    Args:
+        conn1, conn2: Connector IDs to compare
+
+    Returns:
+        True if the parts around the first '2' are swapped between the two IDs
+    """
+    i1 = conn1.find('2')
+    i2 = conn2.find('2')
+    if i1 < 0 or i2 < 0:
+        return False
+    # Check if parts are swapped: (A,B) vs (B,A)
+    return conn1[:i1] == conn2[i2 + 1:] and conn1[i1 + 1:] == conn2[:i2]
+
+
+@lru_cache(maxsize=_LABEL_CACHE_SIZE)
+def classify_text(text: str) -> int:
+    """
+    Classify a text label with a single match of the combined label pattern.
+
+    Replaces running the connector, ground, option, splice and wire spec regexes
+    one after another on the same string.
+
+    Args:
+        text: Text to classify
+
+    Returns:
+        One of TEXT_CONNECTOR, TEXT_GROUND, TEXT_SPLICE, TEXT_WIRE, TEXT_OTHER
+    """
+    return _match_text_kind(text)
+
+
+def _match_text_kind(text: str) -> int:
+    """Classify text without consulting the cache (see classify_text)."""
+    # Every label kind starts with an uppercase ASCII letter, '_' (ground points),
+    # a digit or '.' (wire specs)
+    first = text[:1]
+    if not ('A' <= first <= 'Z' or first == '_' or first == '.' or first.isdecimal()):
+        return TEXT_OTHER
+    match = _RE_LABEL.match(text)
+    if match:
+        return _LABEL_KINDS[match.lastgroup]
+    # Shielded pair (multiline): "MAIN202 (XR-)\nMAIN642 (XR+)"
+    # One match validates both lines
+    if '\n' in text and _RE_SHIELDED_PAIR.match(text):
+        return TEXT_CONNECTOR
+    return TEXT_OTHER
 
 
 def is_connector_id(text: str) -> bool:
@@ -36,38 +133,12 @@ def is_connector_id(text: str) -> bool:
     Returns:
         True if text matches connector ID pattern
     """
-    # Exclude both labeled (SP001) and custom (SP_CUSTOM_001) splices
-    if text.startswith('SP'):
+    # Connector and ground IDs start with an uppercase ASCII letter or '_' (_106(m))
+    first = text[:1]
+    if not ('A' <= first <= 'Z' or first == '_'):
         return False
-    # Exclude GND labels (GND, GND1, GND2, etc.) - these are descriptions, not connectors
-    if re.match(r'^GND\d*$', text):
-        return False
-    # Standard connector pattern: MH3202C, FL7210, MH2FL, MAIN557, MAIN38, RRSS380_A
-    # Support 2-4 letter prefixes to handle connectors like MAIN
-    # Support underscores in connector names (e.g., RRSS380_A)
-    if re.match(r'^[A-Z]{2,4}\d{1,5}[A-Z_]{0,5}$', text):
-        return True
-    # Ground point pattern: G22B(m), G05(z), G22_B(m), etc.
-    # Allow underscores between letters
-    if re.match(r'^[A-Z_]+\d+[A-Z_]*\([a-z]\)$', text):
-        return True
-    # Multiline connector with options: MAIN202 (XR-), MAIN642 (XR+)
-    # Format: CONNECTOR_ID space (OPTION)
-    if re.match(r'^[A-Z]{2,4}\d{1,5}[A-Z_]{0,5}\s+\([A-Z]+[+-]\)$', text):
-        return True
-    # Shielded pair (multiline): "MAIN202 (XR-)\nMAIN642 (XR+)"
-    # Check if text contains newline and both lines match connector pattern
-    if '\n' in text:
-        lines = text.split('\n')
-        if len(lines) == 2:
-            # Both lines should match connector patterns
-            line1_match = (re.match(r'^[A-Z]{2,4}\d{1,5}[A-Z_]{0,5}$', lines[0]) or
-                          re.match(r'^[A-Z]{2,4}\d{1,5}[A-Z_]{0,5}\s+\([A-Z]+[+-]\)$', lines[0]))
-            line2_match = (re.match(r'^[A-Z]{2,4}\d{1,5}[A-Z_]{0,5}$', lines[1]) or
-                          re.match(r'^[A-Z]{2,4}\d{1,5}[A-Z_]{0,5}\s+\([A-Z]+[+-]\)$', lines[1]))
-            if line1_match and line2_match:
-                return True
-    return False
+    kind = classify_text(text)
+    return kind == TEXT_CONNECTOR or kind == TEXT_GROUND
 
 
 def is_splice_point(text: str) -> bool:
@@ -83,15 +154,12 @@ def is_splice_point(text: str) -> bool:
     Returns:
         True if text matches splice point pattern (SP* or SP_CUSTOM_*)
     """
-    # Match SP001 format
-    if re.match(r'^SP\d+$', text):
-        return True
-    # Match SP_CUSTOM_001 format
-    if text.startswith('SP_CUSTOM_'):
-        return True
-    return False
+    if not text.startswith('SP'):
+        return False
+    return classify_text(text) == TEXT_SPLICE
 
 
+@lru_cache(maxsize=_LABEL_CACHE_SIZE)
 def is_pin_number(text: str) -> bool:
     """
     Check if text is a pin number.
@@ -105,12 +173,8 @@ def is_pin_number(text: str) -> bool:
         True if text is a valid pin number
     """
     # Regular pin: pure digits
-    if text.isdigit():
-        return True
     # Dash-separated pin: N-M format (e.g., "3-1", "4-2")
-    if re.match(r'^\d+-\d+$', text):
-        return True
-    return False
+    return text.isdigit() or _RE_PIN_DASH.match(text) is not None
 
 
 def is_wire_spec(text: str) -> bool:
@@ -123,7 +187,7 @@ def is_wire_spec(text: str) -> bool:
     Returns:
         True if text matches wire spec pattern (e.g., "0.35,GY/PU" or "0.35, GY/PU")
     """
-    return bool(re.match(r'^([\d.]+),\s*([A-Z]{2,}(?:/[A-Z]{2,})?)$', text))
+    return classify_text(text) == TEXT_WIRE
 
 
 def parse_wire_spec(text: str) -> Optional[Tuple[str, str]]:
@@ -136,16 +200,238 @@ def parse_wire_spec(text: str) -> Optional[Tuple[str, str]]:
     Returns:
         Tuple of (diameter, color) or None if not a wire spec
     """
-    match = re.match(r'^([\d.]+),\s*([A-Z]{2,}(?:/[A-Z]{2,})?)$', text)
-    if match:
-        return match.group(1), match.group(2)
-    return None
+    # Grammar: DIAMETER "," [spaces] COLOR ["/" COLOR], e.g. "0.35,GY/PU" or "0.5, BK"
+    # Split on the comma instead of running a regex; this is called for every text label
+    if text.endswith('\n'):
+        text = text[:-1]
+    diameter, comma, color = text.partition(',')
+    if not comma or not diameter:
+        return None
+    digits = diameter.replace('.', '')
+    if digits and not digits.isdecimal():
+        return None
+    color = color.lstrip()
+    main_color, slash, stripe_color = color.partition('/')
+    if not _is_color_code(main_color):
+        return None
+    if slash and not _is_color_code(stripe_color):
+        return None
+    return diameter, color
+
+
+def _is_color_code(text: str) -> bool:
+    """Check text is a wire color code: two or more ASCII uppercase letters (BK, GY, PU)."""
+    return len(text) >= 2 and text.isascii() and text.isalpha() and text.isupper()
+
+
+def _junction_split_index(conn_id: str) -> int:
+    """
+    Detect junction pattern: PREFIX12PREFIX2 (e.g., MH2FL, FL2MH, FTL2FL, FL2FTL).
+
+    Junction has '2' in middle, splits into two 2-3 letter alphabetic parts.
+
+    Returns:
+        Position of the separating '2', or -1 if conn_id is not a junction pair name
+    """
+    i = conn_id.find('2')
+    if i < 2 or i > 3:
+        return -1
+    suffix_len = len(conn_id) - i - 1
+    if suffix_len < 2 or suffix_len > 3:
+        return -1
+    if conn_id[:i].isalpha() and conn_id[i + 1:].isalpha():
+        return i
+    return -1
+
+
+def _junction_mirror(conn_id: str) -> Optional[str]:
+    """Return the mirrored junction name (MH2FL -> FL2MH), or None if not a junction pair name."""
+    i = _junction_split_index(conn_id)
+    if i < 0:
+        return None
+    return f"{conn_id[i + 1:]}2{conn_id[:i]}"
+
+
+class TextIndex:
+    """
+    Lookup buckets pre-extracted from a list of text elements.
+
+    Pin lookups only need a few kinds of labels, so they are classified once here
+    instead of re-checking every text element on every call. Each bucket keeps
+    the original element order (lookups break ties by it) plus an X-sorted view
+    so a query only visits labels inside its horizontal window. Connectors also
+    get a Y-sorted view for lookups bounded vertically (just above a pin).
+
+    Buckets:
+        connectors: (connector_id, x, y, max_x_dist, max_x_dist_above), where
+            max_x_dist is the horizontal window used by find_connector_above_pin
+            (junction pairs) and max_x_dist_above the one used by
+            find_all_connectors_above_pin
+        endpoints: (content, x, y, is_splice, is_ground) for pin numbers, splice
+            points and ground connectors (routing endpoints)
+        plain_connectors: (connector_id, x, y) for connectors without '('
+        junction_mirrors: junction pair name -> mirrored name (MH2FL -> FL2MH)
+
+    Label lists (TextElements in original order, for extractors that scan a kind):
+        splice_labels: splice points
+        pin_splice_labels: pin numbers (regular or dash-separated) and splice points
+        connection_labels: pin_splice_labels plus ground connectors (also Y-sorted,
+            see connection_labels_near_y)
+        plain_connector_labels: connector labels without '(' (not ground; also
+            Y-sorted, see plain_connector_labels_near_y)
+        pin_labels: pin numbers (regular or dash-separated; also Y-sorted)
+        ground_labels: ground connectors, connector IDs with '(' (also Y-sorted)
+        component_labels: pin numbers, connector IDs and splice points (also
+            X-sorted, see component_labels_near_x)
+    """
+
+    def __init__(self, text_elements: List[TextElement]):
+        self.text_elements = text_elements
+        self.connectors = []
+        self.endpoints = []
+        self.plain_connectors = []
+        self.junction_mirrors = {}
+        self.splice_labels = []
+        self.pin_splice_labels = []
+        self.connection_labels = []
+        self.plain_connector_labels = []
+        self.pin_labels = []
+        self.ground_labels = []
+        self.component_labels = []
+        self.above_pin_cache = {}  # find_connector_above_pin results by query
+        for elem in text_elements:
+            content = elem.content
+            kind = classify_text(content)
+            is_connector = kind == TEXT_CONNECTOR or kind == TEXT_GROUND
+            if is_connector:
+                mirror_name = _junction_mirror(content)
+                if mirror_name is not None:
+                    self.junction_mirrors[content] = mirror_name
+                self.connectors.append((
+                    content, elem.x, elem.y,
+                    100 if mirror_name is not None else 50,
+                    100 if is_junction_connector(content) else 50
+                ))
+                if '(' not in content:
+                    self.plain_connectors.append((content, elem.x, elem.y))
+                    self.plain_connector_labels.append(elem)
+            is_ground = is_connector and '(' in content
+            is_splice = kind == TEXT_SPLICE
+            if content.isdigit() or is_splice or is_ground:
+                self.endpoints.append((content, elem.x, elem.y, is_splice, is_ground))
+            is_pin = is_pin_number(content)
+            if is_splice:
+                self.splice_labels.append(elem)
+            if is_pin:
+                self.pin_labels.append(elem)
+            if is_ground:
+                self.ground_labels.append(elem)
+            if is_splice or is_pin:
+                self.pin_splice_labels.append(elem)
+                self.connection_labels.append(elem)
+            elif is_ground:
+                self.connection_labels.append(elem)
+            if is_connector or is_splice or is_pin:
+                self.component_labels.append(elem)
+
+        # Widest horizontal window any connector needs: 50 on pages without junctions,
+        # so queries on those pages visit a narrower X range
+        self.max_x_dist = max((c[3] for c in self.connectors), default=50)
+
+        self._connectors_by_x = self._sort_by(self.connectors, 1)
+        self._connectors_by_y = self._sort_by(self.connectors, 2)
+        self._endpoints_by_x = self._sort_by(self.endpoints, 1)
+        self._plain_connectors_by_x = self._sort_by(self.plain_connectors, 1)
+        self._connection_labels_by_y = self._sort_labels_by_y(self.connection_labels)
+        self._plain_connector_labels_by_y = self._sort_labels_by_y(self.plain_connector_labels)
+        self._pin_labels_by_y = self._sort_labels_by_y(self.pin_labels)
+        self._ground_labels_by_y = self._sort_labels_by_y(self.ground_labels)
+        self._component_labels_by_x = self._sort_labels_by_x(self.component_labels)
+
+    @staticmethod
+    def _sort_by(entries: list, axis: int) -> Tuple[List[float], List[int]]:
+        """Return (sorted coordinate values, original indices in the same order) for a bucket."""
+        order = sorted(range(len(entries)), key=lambda i: entries[i][axis])
+        return [entries[i][axis] for i in order], order
+
+    @staticmethod
+    def _sort_labels_by_y(labels: List[TextElement]) -> Tuple[List[float], List[int]]:
+        """Return (sorted Y values, original indices in the same order) for a label list."""
+        order = sorted(range(len(labels)), key=lambda i: labels[i].y)
+        return [labels[i].y for i in order], order
+
+    @staticmethod
+    def _sort_labels_by_x(labels: List[TextElement]) -> Tuple[List[float], List[int]]:
+        """Return (sorted X values, original indices in the same order) for a label list."""
+        order = sorted(range(len(labels)), key=lambda i: labels[i].x)
+        return [labels[i].x for i in order], order
+
+    @staticmethod
+    def _in_range(entries: list, by_axis: Tuple[List[float], List[int]], low: float, high: float) -> list:
+        """
+        Return bucket entries whose coordinate lies in [low, high], in original order.
+
+        Callers pad the range by one unit so float rounding never drops an entry,
+        and still apply their exact distance test.
+        """
+        values, order = by_axis
+        lo = bisect_left(values, low)
+        hi = bisect_right(values, high)
+        return [entries[i] for i in sorted(order[lo:hi])]
+
+    def connectors_near_x(self, x: float, max_dx: float) -> list:
+        """Connector entries within max_dx of x horizontally."""
+        return self._in_range(self.connectors, self._connectors_by_x, x - max_dx - 1, x + max_dx + 1)
+
+    def connectors_above_y(self, y: float, min_dy: float, max_dy: float) -> list:
+        """Connector entries between min_dy and max_dy above y (smaller Y)."""
+        return self._in_range(self.connectors, self._connectors_by_y, y - max_dy - 1, y - min_dy + 1)
+
+    def endpoints_near_x(self, x: float, max_dx: float) -> list:
+        """Pin, splice and ground entries within max_dx of x horizontally."""
+        return self._in_range(self.endpoints, self._endpoints_by_x, x - max_dx - 1, x + max_dx + 1)
+
+    def plain_connectors_near_x(self, x: float, max_dx: float) -> list:
+        """Connector entries without '(' within max_dx of x horizontally."""
+        return self._in_range(self.plain_connectors, self._plain_connectors_by_x, x - max_dx - 1, x + max_dx + 1)
+
+    def connection_labels_near_y(self, low_y: float, high_y: float) -> List[TextElement]:
+        """Connection labels (pins, splices, ground connectors) with Y in [low_y, high_y]."""
+        return self._in_range(self.connection_labels, self._connection_labels_by_y, low_y - 1, high_y + 1)
+
+    def plain_connector_labels_near_y(self, low_y: float, high_y: float) -> List[TextElement]:
+        """Connector labels without '(' with Y in [low_y, high_y]."""
+        return self._in_range(self.plain_connector_labels, self._plain_connector_labels_by_y, low_y - 1, high_y + 1)
+
+    def pin_labels_near_y(self, low_y: float, high_y: float) -> List[TextElement]:
+        """Pin number labels with Y in [low_y, high_y]."""
+        return self._in_range(self.pin_labels, self._pin_labels_by_y, low_y - 1, high_y + 1)
+
+    def ground_labels_near_y(self, low_y: float, high_y: float) -> List[TextElement]:
+        """Ground connector labels with Y in [low_y, high_y]."""
+        return self._in_range(self.ground_labels, self._ground_labels_by_y, low_y - 1, high_y + 1)
+
+    def component_labels_near_x(self, x: float, max_dx: float) -> List[TextElement]:
+        """Component labels (pins, connector IDs, splices) within max_dx of x horizontally."""
+        return self._in_range(self.component_labels, self._component_labels_by_x, x - max_dx - 1, x + max_dx + 1)
+
+
+# Lookups accept the text element list, or a TextIndex built from it once per
+# extraction (extractors pass their shared index so nothing is rebuilt per call)
+TextSource = Union[List[TextElement], TextIndex]
+
+
+def _text_index(text_elements: TextSource) -> TextIndex:
+    """Return the index itself, or build a TextIndex for a plain list."""
+    if isinstance(text_elements, TextIndex):
+        return text_elements
+    return TextIndex(text_elements)
 
 
 def find_connector_above_pin(
     pin_x: float,
     pin_y: float,
-    text_elements: List[TextElement],
+    text_elements: TextSource,
     prefer_as_source: bool = False,
     source_x: float = None,
     destination_x: float = None
@@ -155,7 +441,7 @@ def find_connector_above_pin(
 
     Args:
         pin_x, pin_y: Pin coordinates
-        text_elements: List of all text elements
+        text_elements: List of all text elements, or a TextIndex built from them
         prefer_as_source: If True, for mirrored junction pairs, prefer the variant where shorter prefix is LAST
                          If False, for mirrored junction pairs, prefer the variant where shorter prefix is FIRST
         source_x: X coordinate of source (for junction selection when this pin is destination)
@@ -164,68 +450,123 @@ def find_connector_above_pin(
     Returns:
         Tuple of (connector_id, x, y) or None if no connector found
     """
-    connectors_above = []
+    index = _text_index(text_elements)
+    # Shared pins are looked up again for every wire they sit on; results are
+    # memoized on the index so they are dropped together with it
+    key = (pin_x, pin_y, prefer_as_source, source_x, destination_x)
+    cache = index.above_pin_cache
+    if key in cache:
+        return cache[key]
+    connectors_above = _filter_connectors_above(
+        pin_x, pin_y, index.connectors_near_x(pin_x, index.max_x_dist)
+    )
+    result = cache[key] = _select_connector_above_pin(
+        pin_x, connectors_above, index, prefer_as_source, source_x, destination_x
+    )
+    return result
+
+
+class _Candidate(NamedTuple):
+    """A connector above a pin, with its distances from the pin."""
+    dist_sq: float  # Squared Euclidean distance (ordering only)
+    y_dist: float
+    x_dist: float
+    conn_id: str
+    x: float
+    y: float
+
+
+def _filter_connectors_above(
+    pin_x: float,
+    pin_y: float,
+    candidates: list
+) -> List[_Candidate]:
+    """
+    Keep the TextIndex connector entries that are above the pin and within their X window.
 
-    for elem in text_elements:
-        if not is_connector_id(elem.content):
-            continue
+    Each kept connector becomes its final _Candidate here, so no intermediate
+    tuples are built before selection.
 
+    Returns:
+        List of _Candidate in element order
+    """
+    connectors_above = []
+    for conn_id, cx, cy, max_x_dist, _ in candidates:
         # Check if connector is above the pin
-        x_dist = abs(elem.x - pin_x)
-        y_dist = pin_y - elem.y
+        x_dist = abs(cx - pin_x)
+        y_dist = pin_y - cy
 
         # Connector must be above (positive y_dist) and horizontally aligned
-        conn_id = elem.content
+        # Junctions (MH2FL, FL2MH, FTL2FL, FL2FTL) get a wider window
+        if x_dist < max_x_dist and y_dist > 5:
+            # Squared Euclidean distance for final selection (only used for ordering)
+            connectors_above.append(_Candidate(y_dist * y_dist + x_dist * x_dist, y_dist, x_dist, conn_id, cx, cy))
+    return connectors_above
+
 
-        # Detect junction pattern: PREFIX12PREFIX2 (e.g., MH2FL, FL2MH, FTL2FL, FL2FTL)
-        # Junction has '2' in middle, splits into two 2-3 letter alphabetic parts
-        is_junction = False
-        if '2' in conn_id and len(conn_id) >= 5:
-            parts = conn_id.split('2', 1)
-            if len(parts) == 2 and all(p.isalpha() and 2 <= len(p) <= 3 for p in parts):
-                is_junction = True
+def _pick_junction(junc1: _Candidate, junc2: _Candidate, prefer_source: bool) -> _Candidate:
+    """
+    Pick one half of a mirrored junction pair by its naming direction.
 
-        max_x_dist = 100 if is_junction else 50
+    Args:
+        junc1, junc2: Junction candidates, closest first
+        prefer_source: If True prefer the source variant (JUNCTION_ID2*),
+                       otherwise the destination variant (*2JUNCTION_ID)
+
+    Returns:
+        The preferred candidate, or junc1 if neither matches
+    """
+    preferred = is_source_junction if prefer_source else is_destination_junction
+    if preferred(junc1.conn_id):
+        return junc1
+    if preferred(junc2.conn_id):
+        return junc2
+    return junc1
 
-        if x_dist < max_x_dist and y_dist > 5:
-            connectors_above.append((y_dist, elem.content, elem.x, elem.y))
 
+def _select_connector_above_pin(
+    pin_x: float,
+    connectors_above: List[_Candidate],
+    index: TextIndex,
+    prefer_as_source: bool = False,
+    source_x: float = None,
+    destination_x: float = None
+) -> Optional[Tuple[str, float, float]]:
+    """
+    Pick the connector for a pin from its candidates (see find_connector_above_pin).
+
+    Args:
+        pin_x: Pin X coordinate
+        connectors_above: Candidates in element order (from _filter_connectors_above)
+        index: TextIndex of the text elements (for junction mirror names)
+        prefer_as_source, source_x, destination_x: See find_connector_above_pin
+
+    Returns:
+        Tuple of (connector_id, x, y) or None if there are no candidates
+    """
     if not connectors_above:
         return None
 
-    # Sort by Y distance first, then X distance for ties
-    # Calculate Euclidean distance for final selection
-    connectors_with_distance = []
-    for y_dist, cid, cx, cy in connectors_above:
-        x_dist_from_pin = abs(cx - pin_x)
-        euclidean_dist = math.sqrt(y_dist**2 + x_dist_from_pin**2)
-        connectors_with_distance.append((euclidean_dist, y_dist, x_dist_from_pin, cid, cx, cy))
-
-    # Sort by Euclidean distance
-    connectors_with_distance.sort(key=lambda c: c[0])
+    # Ordered by squared Euclidean distance below; sorts keep element order for ties
+    connectors_with_distance = connectors_above
 
     # CRITICAL: If source_x is provided, prefer connectors BETWEEN source and pin
     # This handles shared pins where multiple connectors are above the same pin
     if source_x is not None and not prefer_as_source:
-        # Separate connectors into "between" and "not between"
+        # Sort by Euclidean distance (the full order feeds the "between" re-sort)
+        connectors_with_distance.sort(key=lambda c: c.dist_sq)
+
+        # Separate connectors into "between" and "not between" source_x and pin_x
+        # (wire may go left to right or right to left, so order the bounds once)
+        lo_x, hi_x = (source_x, pin_x) if source_x < pin_x else (pin_x, source_x)
+        # (one pass; both lists stay in Euclidean order)
         between_connectors = []
         other_connectors = []
-
-        for conn in connectors_with_distance:
-            eucl_dist, y_dist, x_dist, cid, cx, cy = conn
-
-            # Check if connector is between source_x and pin_x
-            if source_x < pin_x:
-                # Wire goes left to right
-                is_between = source_x < cx < pin_x
-            else:
-                # Wire goes right to left
-                is_between = pin_x < cx < source_x
-
-            if is_between:
-                between_connectors.append(conn)
+        for c in connectors_with_distance:
+            if lo_x < c.x < hi_x:
+                between_connectors.append(c)
             else:
-                other_connectors.append(conn)
+                other_connectors.append(c)
 
         # If we have connectors between, prioritize them
         if between_connectors:
@@ -238,37 +579,38 @@ def find_connector_above_pin(
             #    Example: SP_CUSTOM_001 → RS808 (X dist=41) vs RS911 (X dist=64) → pick RS808 (to the left)
 
             # Filter to connectors within 50 Y units of pin
-            close_between_connectors = [c for c in between_connectors if c[1] < 50]  # c[1] is Y distance
+            close_between_connectors = [c for c in between_connectors if c.y_dist < 50]
 
             # If we have close connectors, use them; otherwise use all between connectors
             connectors_to_sort = close_between_connectors if close_between_connectors else between_connectors
 
             # Check Y distance range among connectors to sort
-            y_distances = [c[1] for c in connectors_to_sort]
-            min_y_dist = min(y_distances)
-            max_y_dist = max(y_distances)
-            y_range = max_y_dist - min_y_dist
-
-            if y_range > 50:
-                # Large Y range: prefer connector closest to pin (smallest Euclidean distance)
-                connectors_to_sort.sort(key=lambda c: c[0])  # c[0] is Euclidean distance
-            else:
+            y_distances = [c.y_dist for c in connectors_to_sort]
+            y_range = max(y_distances) - min(y_distances)
+
+            # Large Y range: prefer connector closest to pin (smallest Euclidean distance),
+            # which is the order connectors_to_sort is already in
+            if y_range <= 50:
                 # Small Y range: prefer connector closest to source (smallest X distance to source)
-                connectors_to_sort.sort(key=lambda c: abs(c[4] - source_x))  # c[4] is connector X
+                connectors_to_sort.sort(key=lambda c: abs(c.x - source_x))
 
             connectors_with_distance = connectors_to_sort + other_connectors
+    else:
+        # Only the 3 closest are examined below; nsmallest keeps sort's tie order
+        connectors_with_distance = heapq.nsmallest(3, connectors_with_distance, key=lambda c: c.dist_sq)
 
     # Check for junction pairs (mirrored connectors like FL2MH/MH2FL, FTL2FL/FL2FTL)
+    # CRITICAL: Both halves of the pair must be among the 3 closest candidates
+    # (pages without any junction names skip this entirely)
     has_junction_pair = False
     junction_connectors = []
-    for c in connectors_with_distance[:3]:
-        if '2' in c[3] and len(c[3]) >= 5:
-            parts = c[3].split('2', 1)
-            if len(parts) == 2 and all(p.isalpha() and 2 <= len(p) <= 3 for p in parts):
-                mirror_name = f"{parts[1]}2{parts[0]}"
-                if any(c2[3] == mirror_name for c2 in connectors_with_distance[:3]):
-                    has_junction_pair = True
-                    junction_connectors.append(c)
+    if index.junction_mirrors:
+        top_candidates = connectors_with_distance[:3]
+        top_ids = {c.conn_id for c in top_candidates}
+        for c in top_candidates:
+            if index.junction_mirrors.get(c.conn_id) in top_ids:
+                has_junction_pair = True
+                junction_connectors.append(c)
 
     # Special handling for junction pairs
     if has_junction_pair and len(junction_connectors) >= 2:
@@ -276,99 +618,29 @@ def find_connector_above_pin(
 
         # If destination_x is provided (this pin is source), pick junction CLOSER to destination
         if destination_x is not None and prefer_as_source:
-            junc1_x, junc2_x = junc1[4], junc2[4]
-            dist1_to_dest = abs(junc1_x - destination_x)
-            dist2_to_dest = abs(junc2_x - destination_x)
-
-            # Pick the junction closer to the destination
-            if dist1_to_dest < dist2_to_dest:
-                conn_id, conn_x, conn_y = junc1[3], junc1[4], junc1[5]
-            else:
-                conn_id, conn_x, conn_y = junc2[3], junc2[4], junc2[5]
+            if abs(junc1.x - destination_x) < abs(junc2.x - destination_x):
+                return (junc1.conn_id, junc1.x, junc1.y)
+            return (junc2.conn_id, junc2.x, junc2.y)
 
-            return (conn_id, conn_x, conn_y)
-
-        # If we know the source X position, pick the junction that's between source and destination
+        # If we know the source X position (this pin is destination), pick the junction
+        # that's between source_x and pin_x (wire may go left to right or right to left)
         if source_x is not None and not prefer_as_source:
-            # For destination: pick the junction that's between source_x and pin_x
-            junc1_x, junc2_x = junc1[4], junc2[4]
-
-            # Identify junction type for type-specific logic
-            is_mh_junction = 'MH2FL' in junc1[3] or 'FL2MH' in junc1[3]
-
-            # Check if wire goes left-to-right or right-to-left
-            if source_x < pin_x:
-                # Wire goes left to right: pick junction between source and pin
-                junc1_between = source_x < junc1_x < pin_x
-                junc2_between = source_x < junc2_x < pin_x
-            else:
-                # Wire goes right to left: pick junction between pin and source
-                junc1_between = pin_x < junc1_x < source_x
-                junc2_between = pin_x < junc2_x < source_x
-
-            if junc1_between and junc2_between:
-                # Both between: prefer based on prefer_as_source rule
-                if not prefer_as_source:
-                    # Destination: prefer destination junction variant
-                    if is_destination_junction(junc1[3]):
-                        conn_id, conn_x, conn_y = junc1[3], junc1[4], junc1[5]
-                    elif is_destination_junction(junc2[3]):
-                        conn_id, conn_x, conn_y = junc2[3], junc2[4], junc2[5]
-                    else:
-                        conn_id, conn_x, conn_y = junc1[3], junc1[4], junc1[5]
-                else:
-                    # Source: prefer source junction variant
-                    if is_source_junction(junc1[3]):
-                        conn_id, conn_x, conn_y = junc1[3], junc1[4], junc1[5]
-                    elif is_source_junction(junc2[3]):
-                        conn_id, conn_x, conn_y = junc2[3], junc2[4], junc2[5]
-                    else:
-                        conn_id, conn_x, conn_y = junc1[3], junc1[4], junc1[5]
-            elif junc1_between and not junc2_between:
-                # Only junc1 is between: prefer it
-                conn_id, conn_x, conn_y = junc1[3], junc1[4], junc1[5]
-            elif junc2_between and not junc1_between:
-                # Only junc2 is between: prefer it
-                conn_id, conn_x, conn_y = junc2[3], junc2[4], junc2[5]
-            else:
-                # Neither between: prefer based on prefer_as_source rule
-                if not prefer_as_source:
-                    # Destination: prefer destination junction variant
-                    if is_destination_junction(junc1[3]):
-                        conn_id, conn_x, conn_y = junc1[3], junc1[4], junc1[5]
-                    elif is_destination_junction(junc2[3]):
-                        conn_id, conn_x, conn_y = junc2[3], junc2[4], junc2[5]
-                    else:
-                        conn_id, conn_x, conn_y = junc1[3], junc1[4], junc1[5]
-                else:
-                    # Source: prefer source junction variant
-                    if is_source_junction(junc1[3]):
-                        conn_id, conn_x, conn_y = junc1[3], junc1[4], junc1[5]
-                    elif is_source_junction(junc2[3]):
-                        conn_id, conn_x, conn_y = junc2[3], junc2[4], junc2[5]
-                    else:
-                        conn_id, conn_x, conn_y = junc1[3], junc1[4], junc1[5]
-        else:
-            # No source info: use prefer_as_source rule
-            if not prefer_as_source:
-                # Destination: prefer destination junction variant
-                if is_destination_junction(junc1[3]):
-                    conn_id, conn_x, conn_y = junc1[3], junc1[4], junc1[5]
-                elif is_destination_junction(junc2[3]):
-                    conn_id, conn_x, conn_y = junc2[3], junc2[4], junc2[5]
-                else:
-                    conn_id, conn_x, conn_y = junc1[3], junc1[4], junc1[5]
-            else:
-                # Source: prefer source junction variant
-                if is_source_junction(junc1[3]):
-                    conn_id, conn_x, conn_y = junc1[3], junc1[4], junc1[5]
-                elif is_source_junction(junc2[3]):
-                    conn_id, conn_x, conn_y = junc2[3], junc2[4], junc2[5]
-                else:
-                    conn_id, conn_x, conn_y = junc1[3], junc1[4], junc1[5]
+            lo_x, hi_x = (source_x, pin_x) if source_x < pin_x else (pin_x, source_x)
+            junc1_between = lo_x < junc1.x < hi_x
+            junc2_between = lo_x < junc2.x < hi_x
+
+            # Only one junction is between: prefer it
+            if junc1_between != junc2_between:
+                chosen = junc1 if junc1_between else junc2
+                return (chosen.conn_id, chosen.x, chosen.y)
+
+        # Both or neither between, or no source info: use prefer_as_source rule
+        chosen = _pick_junction(junc1, junc2, prefer_as_source)
+        conn_id, conn_x, conn_y = chosen.conn_id, chosen.x, chosen.y
     else:
         # No junction pair, use closest
-        conn_id, conn_x, conn_y = connectors_with_distance[0][3], connectors_with_distance[0][4], connectors_with_distance[0][5]
+        closest = connectors_with_distance[0]
+        conn_id, conn_x, conn_y = closest.conn_id, closest.x, closest.y
 
     return (conn_id, conn_x, conn_y)
 
@@ -376,54 +648,132 @@ def find_connector_above_pin(
 def find_connector_above_pin_prefer_ground(
     pin_x: float,
     pin_y: float,
-    text_elements: List[TextElement]
+    text_elements: TextSource
 ) -> Optional[str]:
     """
     Find connector above pin, preferring *2FL variants for ground connections.
 
     Args:
         pin_x, pin_y: Pin coordinates
-        text_elements: List of all text elements
+        text_elements: List of all text elements, or a TextIndex built from them
 
     Returns:
         Connector ID or None
     """
-    connectors_above = []
+    # Same candidate window as find_all_connectors_above_pin, sorted by Y distance
+    connectors_above = find_all_connectors_above_pin(pin_x, pin_y, text_elements)
+    if not connectors_above:
+        return None
 
-    for elem in text_elements:
-        if not is_connector_id(elem.content):
-            continue
+    # Prefer destination junction variants for ground connections (closest one wins)
+    for c in connectors_above:
+        if is_destination_junction(c[1]):
+            return c[1]
 
-        x_dist = abs(elem.x - pin_x)
-        y_dist = pin_y - elem.y
+    # Fall back to closest connector
+    return connectors_above[0][1]
 
-        max_x_dist = 100 if is_junction_connector(elem.content) else 50
-        max_y_dist = 50  # Don't match connectors that are too far above the pin
 
-        if x_dist < max_x_dist and 5 < y_dist < max_y_dist:
-            connectors_above.append((y_dist, elem.content, elem.x, elem.y))
+def get_horizontal_source_pins(horizontal_connections: List) -> frozenset:
+    """
+    Return the (connector_id, pin) source pairs of horizontal_connections.
 
-    if not connectors_above:
-        return None
+    Extractors build this once and pass it to find_nearest_connection_point
+    as horizontal_source_pins, instead of rebuilding it for every lookup.
 
-    connectors_above.sort(key=lambda c: c[0])
+    Args:
+        horizontal_connections: List of horizontal wire connections
 
-    # Prefer destination junction variants for ground connections
-    dest_variants = [c for c in connectors_above if is_destination_junction(c[1])]
-    if dest_variants:
-        return dest_variants[0][1]
+    Returns:
+        Frozenset of (from_id, from_pin) tuples
+    """
+    return frozenset((conn.from_id, conn.from_pin) for conn in horizontal_connections)
 
-    # Fall back to closest connector
-    return connectors_above[0][1]
+
+def _connection_point_for_pin(
+    pin: str,
+    pin_x: float,
+    pin_y: float,
+    text_elements: TextSource,
+    prefer_connector_near_target: bool,
+    horizontal_connections: List,
+    horizontal_source_pins: frozenset = None
+) -> Optional[ConnectionPoint]:
+    """
+    Resolve a pin number to a ConnectionPoint on the connector above it.
+
+    Args:
+        pin: Pin number text
+        pin_x, pin_y: Pin coordinates
+        text_elements: List of all text elements, or a TextIndex built from them
+        prefer_connector_near_target: See find_nearest_connection_point
+        horizontal_connections: List of horizontal wire connections (to filter out pins already in use)
+        horizontal_source_pins: get_horizontal_source_pins(horizontal_connections), if already built
+
+    Returns:
+        ConnectionPoint or None if no connector is above the pin
+    """
+    # CRITICAL: When multiple connectors are above this pin (e.g., MH316 and RLS200),
+    # prefer the connector that's CLOSER TO THE TARGET (polyline endpoint)
+    # This handles cases where the wire routes to a specific connector position
+    if not prefer_connector_near_target:
+        # Use standard logic (connector directly above pin)
+        connector_result = find_connector_above_pin(pin_x, pin_y, text_elements)
+        if connector_result:
+            return ConnectionPoint(connector_result[0], pin, pin_x, pin_y)
+        return None
+
+    # Find all connectors above this pin
+    connectors_above = find_all_connectors_above_pin(pin_x, pin_y, text_elements)
+    if not connectors_above:
+        return None
+
+    # CRITICAL: Prefer connectors WITHOUT existing horizontal wires
+    # This handles shared pins where one connector is already in use for horizontal wiring
+    # BUT: Only filter if multiple connectors are at SIMILAR Y distances
+    # If one is MUCH closer (> 20 Y units difference), rely on deduplication instead
+    if horizontal_connections and len(connectors_above) > 1:
+        # Check Y distance range among CLOSEST TWO connectors
+        # connectors_above is already sorted by Y distance (from find_all_connectors_above_pin)
+        # We only care if the two closest are at similar distances
+        closest_two_y_dists = [connectors_above[0][0], connectors_above[1][0]]
+        y_dist_range = closest_two_y_dists[1] - closest_two_y_dists[0]
+
+        # Only filter if the TWO CLOSEST connectors are at similar distances (< 20 Y units apart)
+        # At >= 20 Y apart, one is much closer - deduplication handles it
+        if y_dist_range < 20:
+            # Get set of pins that have horizontal wires as sources
+            pins_with_horizontal = horizontal_source_pins
+            if pins_with_horizontal is None:
+                pins_with_horizontal = get_horizontal_source_pins(horizontal_connections)
+
+            # Separate connectors into those with/without horizontal wires
+            connectors_without_horizontal = [c for c in connectors_above
+                                             if (c[1], pin) not in pins_with_horizontal]
+
+            # Prefer connectors without horizontal wires, but allow those with if no alternatives
+            if connectors_without_horizontal:
+                connectors_above = connectors_without_horizontal
+
+    # Pick the connector closest to the PIN (by Y-distance)
+    # connectors_above is already sorted by Y-distance, so first one is closest
+    closest_connector = connectors_above[0]
+    return ConnectionPoint(
+        closest_connector[1],  # connector_id
+        pin,
+        pin_x,
+        pin_y
+    )
 
 
 def find_nearest_connection_point(
     target_x: float,
     target_y: float,
-    text_elements: List[TextElement],
+    text_elements: TextSource,
     max_distance: float = 100,
     prefer_connector_near_target: bool = True,
-    horizontal_connections: List = None
+    horizontal_connections: List = None,
+    horizontal_source_pins: frozenset = None
 ) -> Optional[ConnectionPoint]:
     """
     Find the nearest pin or splice point to a target coordinate.
@@ -432,100 +782,64 @@ def find_nearest_connection_point(
 
     Args:
         target_x, target_y: Target coordinates
-        text_elements: List of all text elements
+        text_elements: List of all text elements, or a TextIndex built from them
         max_distance: Maximum distance to search
         prefer_connector_near_target: If True and multiple connectors are above a pin,
                                       prefer the connector closest to target (for polylines)
         horizontal_connections: List of horizontal wire connections (to filter out pins already in use)
+        horizontal_source_pins: get_horizontal_source_pins(horizontal_connections), if already built
 
     Returns:
         ConnectionPoint or None
     """
-    nearest = None
-    min_distance = float('inf')
-
-    for elem in text_elements:
-        # Check for pin numbers (digits), splice points (SP*), or ground connectors
-        is_ground = is_connector_id(elem.content) and '(' in elem.content
-        if elem.content.isdigit() or is_splice_point(elem.content) or is_ground:
-            dist = math.sqrt((elem.x - target_x)**2 + (elem.y - target_y)**2)
-
-            if dist < max_distance and dist < min_distance:
-                min_distance = dist
-
-                if is_splice_point(elem.content):
-                    # It's a splice point
-                    nearest = ConnectionPoint(elem.content, '', elem.x, elem.y)
-                elif is_ground:
-                    # It's a ground connector
-                    nearest = ConnectionPoint(elem.content, '', elem.x, elem.y)
-                else:
-                    # It's a pin number - find the connector above it
-                    # CRITICAL: When multiple connectors are above this pin (e.g., MH316 and RLS200),
-                    # prefer the connector that's CLOSER TO THE TARGET (polyline endpoint)
-                    # This handles cases where the wire routes to a specific connector position
-                    if prefer_connector_near_target:
-                        # Find all connectors above this pin
-                        connectors_above = find_all_connectors_above_pin(elem.x, elem.y, text_elements)
-                        if connectors_above:
-                            # CRITICAL: Prefer connectors WITHOUT existing horizontal wires
-                            # This handles shared pins where one connector is already in use for horizontal wiring
-                            # BUT: Only filter if multiple connectors are at SIMILAR Y distances
-                            # If one is MUCH closer (> 20 Y units difference), rely on deduplication instead
-                            if horizontal_connections and len(connectors_above) > 1:
-                                # Check Y distance range among CLOSEST TWO connectors
-                                # connectors_above is already sorted by Y distance (from find_all_connectors_above_pin)
-                                # We only care if the two closest are at similar distances
-                                closest_two_y_dists = [connectors_above[0][0], connectors_above[1][0]]
-                                y_dist_range = closest_two_y_dists[1] - closest_two_y_dists[0]
-
-                                # Only filter if the TWO CLOSEST connectors are at similar distances (< 20 Y units apart)
-                                # At >= 20 Y apart, one is much closer - deduplication handles it
-                                if y_dist_range < 20:
-                                    # Get set of pins that have horizontal wires as sources
-                                    pins_with_horizontal = set()
-                                    for conn in horizontal_connections:
-                                        pins_with_horizontal.add((conn.from_id, conn.from_pin))
-
-                                    # Separate connectors into those with/without horizontal wires
-                                    connectors_without_horizontal = [c for c in connectors_above
-                                                                    if (c[1], elem.content) not in pins_with_horizontal]
-
-                                    # Prefer connectors without horizontal wires, but allow those with if no alternatives
-                                    if connectors_without_horizontal:
-                                        connectors_above = connectors_without_horizontal
-
-                            # Pick the connector closest to the PIN (by Y-distance)
-                            # connectors_above is already sorted by Y-distance, so first one is closest
-                            closest_connector = connectors_above[0]
-                            nearest = ConnectionPoint(
-                                closest_connector[1],  # connector_id
-                                elem.content,          # pin
-                                elem.x,
-                                elem.y
-                            )
-                    else:
-                        # Use standard logic (connector directly above pin)
-                        connector_result = find_connector_above_pin(elem.x, elem.y, text_elements)
-                        if connector_result:
-                            nearest = ConnectionPoint(
-                                connector_result[0],
-                                elem.content,
-                                elem.x,
-                                elem.y
-                            )
+    # Compare squared distances to avoid a sqrt per candidate
+    min_distance_sq = float('inf')
+    max_distance_sq = max_distance * max_distance
+    index = _text_index(text_elements)
+
+    # Pass 1 (distance only): collect the candidates that were the closest so far, in scan order.
+    # Only pin numbers (digits), splice points (SP*), or ground connectors within
+    # max_distance horizontally can be in range
+    closer_candidates = []
+    for endpoint in index.endpoints_near_x(target_x, max_distance):
+        dx = endpoint[1] - target_x
+        dy = endpoint[2] - target_y
+        dist_sq = dx * dx + dy * dy
+
+        if dist_sq < max_distance_sq and dist_sq < min_distance_sq:
+            min_distance_sq = dist_sq
+            closer_candidates.append(endpoint)
+
+    # Pass 2: resolve the nearest candidate. A pin with no connector above it does not
+    # replace the previous closest candidate, so walk back until one resolves.
+    for content, elem_x, elem_y, is_splice, is_ground in reversed(closer_candidates):
+        if is_splice:
+            # It's a splice point
+            return ConnectionPoint(content, '', elem_x, elem_y)
+        if is_ground:
+            # It's a ground connector
+            return ConnectionPoint(content, '', elem_x, elem_y)
+        # It's a pin number - find the connector above it
+        nearest = _connection_point_for_pin(
+            content, elem_x, elem_y, index,
+            prefer_connector_near_target, horizontal_connections, horizontal_source_pins
+        )
+        if nearest is not None:
+            return nearest
 
     # Fallback: If no pins/splices found, look for regular connector IDs
     # This handles diagrams where connectors don't have individual pin labels
-    if nearest is None:
-        for elem in text_elements:
-            if is_connector_id(elem.content) and '(' not in elem.content:  # Regular connectors (not ground)
-                dist = math.sqrt((elem.x - target_x)**2 + (elem.y - target_y)**2)
+    nearest = None
+    # Regular connectors (not ground), closer than any pin/splice candidate
+    for conn_id, cx, cy in index.plain_connectors_near_x(target_x, max_distance):
+        dx = cx - target_x
+        dy = cy - target_y
+        dist_sq = dx * dx + dy * dy
 
-                if dist < max_distance and dist < min_distance:
-                    min_distance = dist
-                    # Connector without pin
-                    nearest = ConnectionPoint(elem.content, '', elem.x, elem.y)
+        if dist_sq < max_distance_sq and dist_sq < min_distance_sq:
+            min_distance_sq = dist_sq
+            # Connector without pin
+            nearest = ConnectionPoint(conn_id, '', cx, cy)
 
     return nearest
 
@@ -533,7 +847,7 @@ def find_nearest_connection_point(
 def find_all_connectors_above_pin(
     pin_x: float,
     pin_y: float,
-    text_elements: List[TextElement]
+    text_elements: TextSource
 ) -> List[Tuple[float, str, float, float]]:
     """
     Find ALL connectors above a pin (not just the closest).
@@ -542,25 +856,22 @@ def find_all_connectors_above_pin(
 
     Args:
         pin_x, pin_y: Pin coordinates
-        text_elements: List of all text elements
+        text_elements: List of all text elements, or a TextIndex built from them
 
     Returns:
         List of (y_distance, connector_id, x, y) tuples, sorted by Y distance
     """
     connectors_above = []
+    max_y_dist = 50  # Don't match connectors that are too far above the pin
+    index = _text_index(text_elements)
 
-    for elem in text_elements:
-        if not is_connector_id(elem.content):
-            continue
-
-        x_dist = abs(elem.x - pin_x)
-        y_dist = pin_y - elem.y
-
-        max_x_dist = 100 if is_junction_connector(elem.content) else 50
-        max_y_dist = 50  # Don't match connectors that are too far above the pin
+    # The 5..50 unit band above the pin is narrower than the horizontal window
+    for conn_id, cx, cy, _, max_x_dist in index.connectors_above_y(pin_y, 5, max_y_dist):
+        x_dist = abs(cx - pin_x)
+        y_dist = pin_y - cy
 
         if x_dist < max_x_dist and 5 < y_dist < max_y_dist:
-            connectors_above.append((y_dist, elem.content, elem.x, elem.y))
+            connectors_above.append((y_dist, conn_id, cx, cy))
 
     connectors_above.sort(key=lambda c: c[0])
     return connectors_above
@@ -6,19 +6,19 @@ Modular architecture for extracting wire connections from Adobe Illustrator SVG
 import sys
 import json
 import os
+import argparse
+import contextlib
 from typing import Set, Tuple
 from models import IDGenerator
 from svg_parser import (
+    parse_svg_once,
     parse_text_elements,
     merge_multiline_connectors,
     parse_splice_dots,
-    parse_st17_polylines,
     parse_all_polylines,
     parse_st17_paths,
     parse_st1_paths,
-    parse_routing_paths,
-    extract_path_endpoints,
-    extract_path_all_points,
+    parse_routing_path_groups,
     extract_wire_specs,
     map_splice_positions_to_dots,
     generate_ids_for_unlabeled_splices,
@@ -34,7 +34,61 @@ from extractors import (
     HorizontalColoredWireExtractor,
     deduplicate_connections
 )
-from output_formatter import export_to_file, print_summary_statistics
+from connector_finder import TextIndex
+from output_formatter import export_to_file
+
+
+# Parsed exclusion configs keyed by (path, mtime_ns, size), so batch runs
+# re-read a config file only when it changes
+_exclusions_cache = {}
+
+
+def _intern(value):
+    """Intern string config values; anything else is kept as-is."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _read_exclusions_config(config_file: str, stat: os.stat_result) -> Tuple[Set[Tuple[str, str]], Set[Tuple[str, str, str, str]]]:
+    """
+    Read one exclusion config file (cached until the file changes).
+
+    Args:
+        config_file: Path to an existing exclusion config JSON file
+        stat: os.stat() result for config_file
+
+    Returns:
+        Tuple of (pin exclusions, connection pair exclusions), see load_exclusions
+    """
+    key = (config_file, stat.st_mtime_ns, stat.st_size)
+    cached = _exclusions_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Read raw bytes; json.loads detects the UTF encoding itself
+    with open(config_file, 'rb') as f:
+        config = json.loads(f.read())
+
+    # Load pin exclusions (excludes ALL connections for this pin)
+    pin_exclusions = set()
+    for item in config.get('exclusions', []):
+        connector_id = item.get('connector_id', '')
+        pin = item.get('pin', '')
+        if connector_id:  # Pin can be empty for splice points
+            pin_exclusions.add((_intern(connector_id), _intern(pin)))
+
+    # Load connection pair exclusions (excludes specific connection pairs)
+    connection_exclusions = set()
+    for item in config.get('connection_exclusions', []):
+        from_id = item.get('from_connector', '')
+        from_pin = item.get('from_pin', '')
+        to_id = item.get('to_connector', '')
+        to_pin = item.get('to_pin', '')
+        if from_id and to_id:
+            connection_exclusions.add((_intern(from_id), _intern(from_pin),
+                                       _intern(to_id), _intern(to_pin)))
+
+    cached = _exclusions_cache[key] = (pin_exclusions, connection_exclusions)
+    return cached
 
 
 def load_exclusions(svg_file: str = None) -> Tuple[Set[Tuple[str, str]], Set[Tuple[str, str, str, str]]]:
@@ -74,32 +128,16 @@ def load_exclusions(svg_file: str = None) -> Tuple[Set[Tuple[str, str]], Set[Tup
 
     # Try each config file in order
     for config_file in config_files:
-        if not os.path.exists(config_file):
+        # One stat call both checks existence and provides the cache key
+        try:
+            stat = os.stat(config_file)
+        except OSError:
             continue
 
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-
-            # Load pin exclusions (excludes ALL connections for this pin)
-            pin_exclusions = set()
-            for item in config.get('exclusions', []):
-                connector_id = item.get('connector_id', '')
-                pin = item.get('pin', '')
-                if connector_id:  # Pin can be empty for splice points
-                    pin_exclusions.add((connector_id, pin))
-
-            # Load connection pair exclusions (excludes specific connection pairs)
-            connection_exclusions = set()
-            for item in config.get('connection_exclusions', []):
-                from_id = item.get('from_connector', '')
-                from_pin = item.get('from_pin', '')
-                to_id = item.get('to_connector', '')
-                to_pin = item.get('to_pin', '')
-                if from_id and to_id:
-                    connection_exclusions.add((from_id, from_pin, to_id, to_pin))
-
-            return pin_exclusions, connection_exclusions
+            pin_exclusions, connection_exclusions = _read_exclusions_config(config_file, stat)
+            # Copies, so callers never modify the cached sets
+            return set(pin_exclusions), set(connection_exclusions)
         except Exception:
             continue
 
@@ -121,28 +159,39 @@ def apply_exclusions(connections, pin_exclusions: Set[Tuple[str, str]], connecti
     if not pin_exclusions and not connection_exclusions:
         return connections
 
-    filtered = []
-    for conn in connections:
-        from_key = (conn.from_id, conn.from_pin)
-        to_key = (conn.to_id, conn.to_pin)
-        conn_key = (conn.from_id, conn.from_pin, conn.to_id, conn.to_pin)
-
-        if from_key in pin_exclusions or to_key in pin_exclusions:
-            continue
-        if conn_key in connection_exclusions:
-            continue
-
-        filtered.append(conn)
-
-    return filtered
-
+    # Most configs only use one kind of exclusion; skip building the key
+    # tuples the other kind would need
+    if not connection_exclusions:
+        return [
+            conn for conn in connections
+            if (conn.from_id, conn.from_pin) not in pin_exclusions
+            and (conn.to_id, conn.to_pin) not in pin_exclusions
+        ]
+    if not pin_exclusions:
+        return [
+            conn for conn in connections
+            if (conn.from_id, conn.from_pin, conn.to_id, conn.to_pin) not in connection_exclusions
+        ]
+
+    # Keep connections whose endpoints and (from, to) pair are all not excluded
+    return [
+        conn for conn in connections
+        if (conn.from_id, conn.from_pin) not in pin_exclusions
+        and (conn.to_id, conn.to_pin) not in pin_exclusions
+        and (conn.from_id, conn.from_pin, conn.to_id, conn.to_pin) not in connection_exclusions
+    ]
+
+
+def extract_all_connections(svg_file: str):
+    """
+    Run every extractor on an SVG file, printing progress along the way.
 
-def main():
-    """Main entry point for connection extraction."""
-    # Allow command-line override: python extract_connections.py [input.svg] [output.md]
-    svg_file = sys.argv[1] if len(sys.argv) > 1 else 'sample-wire.svg'
-    output_file = sys.argv[2] if len(sys.argv) > 2 else 'connections_output.md'
+    Args:
+        svg_file: Path to the SVG file
 
+    Returns:
+        Tuple of (deduplicated connections, number of duplicates removed)
+    """
     print("=" * 80)
     print("Circuit Diagram Connection Extractor")
     print("=" * 80)
@@ -151,31 +200,38 @@ def main():
     id_generator = IDGenerator()
 
     print("Parsing SVG file...")
-    text_elements = parse_text_elements(svg_file)
+    # Parse the XML once; every parser below walks the same tree
+    svg_root = parse_svg_once(svg_file)
+    text_elements = parse_text_elements(svg_root)
     # Merge multiline connector IDs (e.g., MAIN202 with (XR-) → "MAIN202 (XR-)")
     text_elements = merge_multiline_connectors(text_elements)
-    splice_dots = parse_splice_dots(svg_file)
-    st17_polylines = parse_st17_polylines(svg_file)
-    all_polylines = parse_all_polylines(svg_file)
-    st17_paths = parse_st17_paths(svg_file)
-    st1_paths = parse_st1_paths(svg_file)
-    st0_paths = parse_routing_paths(svg_file, path_classes=['st0'], only_l_shaped=False)
-    st3_st4_paths = parse_routing_paths(svg_file, path_classes=['st3', 'st4'], only_l_shaped=True)
-    st13_paths = parse_routing_paths(svg_file, path_classes=['st13'], only_l_shaped=False)  # Black routing arrows
-    routing_paths = st0_paths + st3_st4_paths + st13_paths
+    splice_dots = parse_splice_dots(svg_root)
+    all_polylines = parse_all_polylines(svg_root)
+    st17_paths = parse_st17_paths(svg_root)
+    st1_paths = parse_st1_paths(svg_root)
+    routing_path_groups = parse_routing_path_groups(svg_root, {
+        'st0': (['st0'], False),
+        'st3_st4': (['st3', 'st4'], True),
+        'st13': (['st13'], False),  # Black routing arrows
+    })
+    routing_paths = routing_path_groups['st0'] + routing_path_groups['st3_st4'] + routing_path_groups['st13']
 
     # Parse grid routing wires (for grid-based diagrams)
-    horizontal_wires = parse_horizontal_colored_wires(svg_file)
-    vertical_wires = parse_vertical_dashed_wires(svg_file)
+    horizontal_wires = parse_horizontal_colored_wires(svg_root)
+    vertical_wires = parse_vertical_dashed_wires(svg_root)
+    # Parsers return plain records; release the XML tree before extraction starts
+    del svg_root
 
     text_elements = map_splice_positions_to_dots(text_elements, splice_dots)
     text_elements = generate_ids_for_unlabeled_splices(text_elements, splice_dots, id_generator)
     wire_specs = extract_wire_specs(text_elements)
+    # Labels classified and sorted once; every extractor shares this index
+    labels = TextIndex(text_elements)
 
     print("\n" + "=" * 80)
     print("Extracting Horizontal Wire Connections")
     print("=" * 80)
-    horizontal_extractor = HorizontalWireExtractor(text_elements, wire_specs, all_polylines)
+    horizontal_extractor = HorizontalWireExtractor(text_elements, wire_specs, all_polylines, labels=labels)
     horizontal_connections = horizontal_extractor.extract_connections()
     print(f"Extracted {len(horizontal_connections)} horizontal wire connections")
 
@@ -184,7 +240,7 @@ def main():
     print("=" * 80)
     if horizontal_wires:
         print(f"Found {len(horizontal_wires)} horizontal colored wires")
-        colored_wire_extractor = HorizontalColoredWireExtractor(text_elements, horizontal_wires, wire_specs)
+        colored_wire_extractor = HorizontalColoredWireExtractor(text_elements, horizontal_wires, wire_specs, labels=labels)
         colored_wire_connections = colored_wire_extractor.extract_connections()
         print(f"Extracted {len(colored_wire_connections)} colored wire connections")
     else:
@@ -195,14 +251,14 @@ def main():
     print("Extracting Routing Connections (polylines + routing paths)")
     print("=" * 80)
     all_routing_paths = st1_paths + routing_paths
-    routing_extractor = VerticalRoutingExtractor(all_polylines, all_routing_paths, text_elements, wire_specs, horizontal_connections)
+    routing_extractor = VerticalRoutingExtractor(all_polylines, all_routing_paths, text_elements, wire_specs, horizontal_connections, labels=labels)
     routing_connections = routing_extractor.extract_connections()
     print(f"Extracted {len(routing_connections)} routing connections (polylines + routing paths)")
 
     print("\n" + "=" * 80)
     print("Extracting Ground Connections (st17 paths)")
     print("=" * 80)
-    ground_extractor = GroundConnectionExtractor(st17_paths, text_elements, wire_specs, horizontal_connections)
+    ground_extractor = GroundConnectionExtractor(st17_paths, text_elements, wire_specs, horizontal_connections, labels=labels)
     ground_connections = ground_extractor.extract_connections()
     print(f"Extracted {len(ground_connections)} ground connections")
 
@@ -218,21 +274,54 @@ def main():
     combined = horizontal_connections + colored_wire_connections + routing_connections + ground_connections + long_routing_connections
     all_connections = deduplicate_connections(combined)
     all_connections = apply_exclusions(all_connections, pin_exclusions, connection_exclusions)
+    return all_connections, len(combined) - len(all_connections)
+
+
+def run_extraction(svg_file: str, output_file: str, write_output: bool = True, quiet: bool = False) -> None:
+    """
+    Extract all connections from an SVG file, export them and print a summary.
+
+    Args:
+        svg_file: Path to the SVG file
+        output_file: Path to the markdown output file
+        write_output: If False, skip exporting (dry run that only reports counts)
+        quiet: If True, suppress the per-extractor progress output (the summary is still printed)
+    """
+    if quiet:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            all_connections, duplicates_removed = extract_all_connections(svg_file)
+    else:
+        all_connections, duplicates_removed = extract_all_connections(svg_file)
 
     print("\n" + "=" * 80)
     print(f"Total connections: {len(all_connections)}")
-    if len(combined) > len(all_connections):
-        print(f"  (Removed {len(combined) - len(all_connections)} duplicates across extractors)")
+    if duplicates_removed > 0:
+        print(f"  (Removed {duplicates_removed} duplicates across extractors)")
     print("=" * 80)
 
-    export_to_file(all_connections, output_file)
+    if write_output:
+        export_to_file(all_connections, output_file)
 
-    horizontal = [c for c in all_connections if c.wire_dm]
-    routing_and_ground = [c for c in all_connections if not c.wire_dm]
+    horizontal, routing_and_ground = [], []
+    for c in all_connections:
+        (horizontal if c.wire_dm else routing_and_ground).append(c)
     print(f"\nBreakdown:")
     print(f"  - Horizontal wires (with specs): {len(horizontal)}")
     print(f"  - Routing + Ground: {len(routing_and_ground)}")
 
 
+def main():
+    """Main entry point for connection extraction."""
+    # Allow command-line override: python extract_connections.py [input.svg] [output.md]
+    parser = argparse.ArgumentParser(description='Extract wire connections from a circuit diagram SVG.')
+    parser.add_argument('svg_file', nargs='?', default='sample-wire.svg', help='input SVG file')
+    parser.add_argument('output_file', nargs='?', default='connections_output.md', help='output markdown file')
+    parser.add_argument('--no-write', action='store_true', help='extract and report counts without writing the output file')
+    parser.add_argument('--quiet', action='store_true', help='suppress per-extractor progress output; the summary is still printed')
+    args = parser.parse_args()
+
+    run_extraction(args.svg_file, args.output_file, write_output=not args.no_write, quiet=args.quiet)
+
+
 if __name__ == '__main__':
     main()
@@ -1,9 +1,9 @@
 """
 Base extractor class with shared utilities for all extractors.
 """
-import math
 from typing import List, Tuple
 from models import Connection, TextElement, WireSpec
+from connector_finder import is_splice_point
 
 
 class BaseExtractor:
@@ -116,15 +116,17 @@ class BaseExtractor:
         target_segment_points = []
         if source_point and horizontal_segments:
             source_x, source_y = source_point
-            min_dist_to_source = float('inf')
+            min_dist_to_source_sq = float('inf')
             closest_segment = None
 
             for idx, x1, y1, x2, y2 in horizontal_segments:
-                # Distance from source to segment midpoint
+                # Squared distance from source to segment midpoint
                 mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
-                dist = math.sqrt((mid_x - source_x)**2 + (mid_y - source_y)**2)
-                if dist < min_dist_to_source:
-                    min_dist_to_source = dist
+                dx = mid_x - source_x
+                dy = mid_y - source_y
+                dist_sq = dx * dx + dy * dy
+                if dist_sq < min_dist_to_source_sq:
+                    min_dist_to_source_sq = dist_sq
                     closest_segment = (x1, y1, x2, y2)
 
             if closest_segment:
@@ -148,7 +150,7 @@ class BaseExtractor:
         else:
             seg_x_min, seg_x_max = None, None
 
-        min_distance = float('inf')
+        min_distance_sq = float('inf')
         closest_spec = None
 
         for spec in self.wire_specs:
@@ -167,13 +169,15 @@ class BaseExtractor:
                 if -50 < y_dist < 0:  # Must be above (spec.y < path.y)
                     # Euclidean distance, strongly prioritize specs directly above (close in Y)
                     # Weight Y-distance MORE to prefer specs just above the wire
-                    distance = math.sqrt(x_dist**2 + (y_dist * 2.0)**2)  # Weight Y more
+                    # (squared; only compared, never reported)
+                    weighted_y = y_dist * 2.0  # Weight Y more
+                    distance_sq = x_dist * x_dist + weighted_y * weighted_y
 
-                    if distance < min_distance:
-                        min_distance = distance
+                    if distance_sq < min_distance_sq:
+                        min_distance_sq = distance_sq
                         closest_spec = spec
 
-        if closest_spec and min_distance < 150:  # Within 150 units
+        if closest_spec and min_distance_sq < 150 * 150:  # Within 150 units
             return (closest_spec.diameter, closest_spec.color)
 
         return ('', '')
@@ -196,7 +200,8 @@ def deduplicate_connections(connections: List[Connection]) -> List[Connection]:
     # 1. Self-loop: Same connector/splice, same pin (e.g., SP123 → SP123, RRS111,5 → RRS111,5)
     # 2. Self-connection: Same connector, different pins (e.g., MAIN76,17 → MAIN76,18)
     # These are caused by arrows pointing to descriptions/labels or misdetected routing paths
-    filtered = []
+    # Single pass: drop self-loops/self-connections and deduplicate as connections arrive
+    seen = {}  # key -> Connection
     self_loop_count = 0
     self_connection_count = 0
 
@@ -207,7 +212,6 @@ def deduplicate_connections(connections: List[Connection]) -> List[Connection]:
         # Check if connection is a self-connection (same connector, different pins)
         # BUT: Allow self-connections WITH wire specs (routing polylines like MAIN42,6 → MAIN42,49)
         # ONLY filter self-connections WITHOUT wire specs (likely errors from misdetected routing)
-        from connector_finder import is_splice_point
         is_invalid_self_connection = (
             conn.from_id == conn.to_id and
             conn.from_pin != conn.to_pin and
@@ -223,27 +227,21 @@ def deduplicate_connections(connections: List[Connection]) -> List[Connection]:
             self_connection_count += 1
             continue
 
-        filtered.append(conn)
-
-    if self_loop_count > 0:
-        print(f"Filtered out {self_loop_count} self-loop connections")
-    if self_connection_count > 0:
-        print(f"Filtered out {self_connection_count} self-connections (same connector, different pins)")
-
-    seen = {}  # key -> Connection
-
-    for conn in filtered:
         key = (conn.from_id, conn.from_pin, conn.to_id, conn.to_pin)
+        existing = seen.get(key)
 
-        if key not in seen:
+        if existing is None:
             # First time seeing this connection
             seen[key] = conn
-        else:
+        elif conn.wire_dm and not existing.wire_dm:
             # Duplicate found - prefer connection WITH wire specs
-            existing = seen[key]
             # If new connection has wire spec and existing doesn't, replace
-            if conn.wire_dm and not existing.wire_dm:
-                seen[key] = conn
-            # If existing has wire spec, keep it (don't replace)
+            # (if existing has wire spec, keep it)
+            seen[key] = conn
+
+    if self_loop_count > 0:
+        print(f"Filtered out {self_loop_count} self-loop connections")
+    if self_connection_count > 0:
+        print(f"Filtered out {self_connection_count} self-connections (same connector, different pins)")
 
     return list(seen.values())
@@ -14,7 +14,8 @@ from models import Connection, TextElement
 from connector_finder import (
     is_splice_point,
     is_pin_number,
-    find_connector_above_pin
+    find_connector_above_pin,
+    TextIndex
 )
 
 
@@ -71,12 +72,13 @@ class GridWireExtractor:
             List of tuples: (connector_id, pin, x, y)
         """
         pins = []
+        labels = TextIndex(self.text_elements)  # Built once for all pin lookups
 
         for elem in self.text_elements:
             # Pin numbers can be single digits or dash-separated format
             if is_pin_number(elem.content) or is_splice_point(elem.content):
                 # Find connector above this pin
-                result = find_connector_above_pin(elem.x, elem.y, self.text_elements)
+                result = find_connector_above_pin(elem.x, elem.y, labels)
                 if result:
                     connector_id, conn_x, conn_y = result
                     pin_number = '' if is_splice_point(elem.content) else elem.content
@@ -4,22 +4,24 @@ Ground connection extractor.
 Extracts ground connections from st17 path elements (arrow heads pointing to ground connectors).
 """
 import re
-import math
 from typing import List, Tuple
 from models import Connection, TextElement, WireSpec
 from connector_finder import (
     is_connector_id,
     is_splice_point,
-    is_pin_number,
-    find_all_connectors_above_pin
+    find_connector_above_pin_prefer_ground,
+    TextIndex
 )
 from .base_extractor import BaseExtractor, deduplicate_connections
 
+# Arrow location: leading absolute moveto of the path
+_RE_MOVE_TO = re.compile(r'M([\d.]+),([\d.]+)')
+
 
 class GroundConnectionExtractor(BaseExtractor):
     """Extracts ground connections from st17 path elements."""
 
-    def __init__(self, paths: List[str], text_elements: List[TextElement], wire_specs: List[WireSpec] = None, horizontal_connections: List[Connection] = None):
+    def __init__(self, paths: List[str], text_elements: List[TextElement], wire_specs: List[WireSpec] = None, horizontal_connections: List[Connection] = None, labels: TextIndex = None):
         # Initialize base class
         super().__init__(text_elements, wire_specs or [])
 
@@ -34,6 +36,13 @@ class GroundConnectionExtractor(BaseExtractor):
                 if conn.to_pin:  # If destination also has a pin
                     self.pins_with_horizontal_wires.add((conn.to_id, conn.to_pin))
 
+        # Ground and pin labels classified once, Y-sorted for the per-arrow scans
+        self.labels = labels if labels is not None else TextIndex(text_elements)
+        self.connector_labels = {}  # connector_id -> first connector label element
+        for elem in text_elements:
+            if is_connector_id(elem.content):
+                self.connector_labels.setdefault(elem.content, elem)
+
     def _find_wire_spec_for_ground(self, pin_x: float, pin_y: float, arrow_x: float, arrow_y: float) -> Tuple[str, str]:
         """
         Find wire spec for a ground connection.
@@ -58,7 +67,7 @@ class GroundConnectionExtractor(BaseExtractor):
         # Y position is typically at the arrow level
         target_y = arrow_y
 
-        min_distance = float('inf')
+        min_distance_sq = float('inf')
         closest_spec = None
 
         for spec in self.wire_specs:
@@ -70,15 +79,16 @@ class GroundConnectionExtractor(BaseExtractor):
             y_dist = spec.y - target_y  # Negative if above
 
             if -50 < y_dist < 0:  # Within 50 units above
-                # Calculate distance with Y-weighting
+                # Calculate squared distance with Y-weighting
                 x_dist = abs(spec.x - pin_x)  # Distance from pin
-                distance = math.sqrt(x_dist**2 + (y_dist * 2.0)**2)
+                weighted_y = y_dist * 2.0
+                distance_sq = x_dist * x_dist + weighted_y * weighted_y
 
-                if distance < min_distance:
-                    min_distance = distance
+                if distance_sq < min_distance_sq:
+                    min_distance_sq = distance_sq
                     closest_spec = spec
 
-        if closest_spec and min_distance < 150:
+        if closest_spec and min_distance_sq < 150 * 150:
             return (closest_spec.diameter, closest_spec.color)
 
         return ('', '')
@@ -94,7 +104,7 @@ class GroundConnectionExtractor(BaseExtractor):
 
         for d_attr in self.paths:
             # Parse M command to get arrow location
-            m_match = re.match(r'M([\d.]+),([\d.]+)', d_attr)
+            m_match = _RE_MOVE_TO.match(d_attr)
             if not m_match:
                 continue
 
@@ -103,60 +113,45 @@ class GroundConnectionExtractor(BaseExtractor):
             # Find all ground connectors within reasonable distance of this arrow
             # Ground connectors can be vertically offset (between multiple arrows)
             nearby_ground_connectors = []
-            for elem in self.text_elements:
-                if is_connector_id(elem.content) and '(' in elem.content:
-                    y_dist = abs(elem.y - path_y)
-                    x_dist = abs(elem.x - path_x)
+            for elem in self.labels.ground_labels_near_y(path_y - 20, path_y + 20):
+                y_dist = abs(elem.y - path_y)
+                x_dist = abs(elem.x - path_x)
 
-                    # Use 20-unit Y threshold and 210-unit X threshold
-                    if y_dist < 20 and x_dist < 210:
-                        nearby_ground_connectors.append((elem.x, elem.y, elem.content))
+                # Use 20-unit Y threshold and 210-unit X threshold
+                if y_dist < 20 and x_dist < 210:
+                    nearby_ground_connectors.append((elem.x, elem.y, elem.content))
 
             if not nearby_ground_connectors:
                 continue
 
-            # For each nearby ground connector, process it
-            for gx, gy, ground_id in nearby_ground_connectors:
-                # Find pins near the arrow
-                pins_with_connectors = []
-
-                for elem in self.text_elements:
-                    if is_pin_number(elem.content):
-                        y_dist = abs(elem.y - path_y)
-                        x_dist = abs(elem.x - path_x)
-
-                        # Pins must be within ±10 Y units of arrow
-                        if y_dist < 10 and x_dist < 210:
-                            # For pins, find ALL connectors above it
-                            connectors_above = find_all_connectors_above_pin(
-                                elem.x, elem.y, self.text_elements
-                            )
-
-                            if connectors_above:
-                                # For ground connections, prefer *2FL pattern
-                                to_fl_variants = [c for c in connectors_above if c[1].endswith('2FL')]
-                                if to_fl_variants:
-                                    chosen_connector = to_fl_variants[0][1]
-                                else:
-                                    chosen_connector = connectors_above[0][1]
-
-                                pins_with_connectors.append((elem.x, chosen_connector, elem.content, elem.y))
-
-                if not pins_with_connectors:
-                    continue
+            # Find pins near the arrow (the same for every nearby ground connector)
+            candidate_pins = []
 
-                # Find all pins near the arrow (within 10 units)
-                candidate_pins = [p for p in pins_with_connectors if abs(p[0] - path_x) < 10]
+            for elem in self.labels.pin_labels_near_y(path_y - 10, path_y + 10):
+                y_dist = abs(elem.y - path_y)
+                x_dist = abs(elem.x - path_x)
 
-                if not candidate_pins:
-                    continue
+                # Pins must be within ±10 Y units of arrow, and only pins within
+                # 10 X units become candidates (don't resolve connectors for the rest)
+                if y_dist < 10 and x_dist < 10:
+                    # For ground connections, prefer *2FL pattern among ALL connectors above the pin
+                    chosen_connector = find_connector_above_pin_prefer_ground(
+                        elem.x, elem.y, self.labels
+                    )
 
+                    if chosen_connector:
+                        candidate_pins.append((elem.x, chosen_connector, elem.content, elem.y))
+
+            if not candidate_pins:
+                continue
+
+            # For each nearby ground connector, process it
+            for gx, gy, ground_id in nearby_ground_connectors:
                 # For each candidate pin, find the connector label position
                 pins_with_label_positions = []
                 for px, pin_conn, pin_num, py in candidate_pins:
                     # Find the connector label in text_elements
-                    connector_label = next((elem for elem in self.text_elements
-                                          if elem.content == pin_conn and is_connector_id(elem.content)), None)
+                    connector_label = self.connector_labels.get(pin_conn)
                     if connector_label:
                         # Calculate distance from connector label to ground connector label
                         label_distance = abs(connector_label.x - gx)
@@ -15,10 +15,9 @@ Algorithm:
 from typing import List, Optional, Tuple
 from models import Connection, TextElement, WireSpec, ConnectionPoint
 from connector_finder import (
-    is_connector_id,
     is_splice_point,
-    is_pin_number,
-    find_all_connectors_above_pin
+    find_all_connectors_above_pin,
+    TextIndex
 )
 
 
@@ -33,10 +32,12 @@ class HorizontalColoredWireExtractor:
 
     def __init__(self, text_elements: List[TextElement],
                  horizontal_wires: List['HorizontalWireSegment'],
-                 wire_specs: List[WireSpec] = None):
+                 wire_specs: List[WireSpec] = None,
+                 labels: TextIndex = None):
         self.text_elements = text_elements
         self.horizontal_wires = horizontal_wires
         self.wire_specs = wire_specs or []
+        self.labels = labels if labels is not None else TextIndex(text_elements)  # Labels grouped by kind, classified once
 
         # Tolerance for finding connectors near wire endpoints
         self.X_TOLERANCE = 30.0  # Connectors within 30 units of wire end
@@ -59,14 +60,9 @@ class HorizontalColoredWireExtractor:
             # (pins and splices within Y tolerance and X range)
             connection_points = []
 
-            for elem in self.text_elements:
-                # CRITICAL: Also check for ground connectors (with parentheses)
-                # Example: G303(s), G22B(m)
-                is_ground_connector = is_connector_id(elem.content) and '(' in elem.content
-
-                if not (is_pin_number(elem.content) or is_splice_point(elem.content) or is_ground_connector):
-                    continue
-
+            # CRITICAL: Also check for ground connectors (with parentheses)
+            # Example: G303(s), G22B(m)
+            for elem in self.labels.connection_labels_near_y(wire.y - self.Y_TOLERANCE, wire.y + self.Y_TOLERANCE):
                 # Check if element is on same horizontal level as wire
                 y_dist = abs(elem.y - wire.y)
                 if y_dist > self.Y_TOLERANCE:
@@ -79,8 +75,8 @@ class HorizontalColoredWireExtractor:
                 # Add connection point
                 if is_splice_point(elem.content):
                     connection_points.append(ConnectionPoint(elem.content, '', elem.x, elem.y))
-                elif is_ground_connector:
-                    # Ground connector - use directly
+                elif '(' in elem.content:
+                    # Ground connector - use directly (pins never contain '(')
                     connection_points.append(ConnectionPoint(elem.content, '', elem.x, elem.y))
                 else:
                     # For pins, determine which side of wire they're on
@@ -164,10 +160,7 @@ class HorizontalColoredWireExtractor:
         connection_points = []
 
         # Find pins on the same horizontal level
-        for elem in self.text_elements:
-            if not (is_pin_number(elem.content) or is_splice_point(elem.content)):
-                continue
-
+        for elem in self.labels.pin_splice_labels:
             y_dist = abs(elem.y - target_y)
             if y_dist > self.Y_TOLERANCE:
                 continue
@@ -203,12 +196,8 @@ class HorizontalColoredWireExtractor:
 
         # Fallback: if no pins found, look for connectors directly
         if not connection_points:
-            for elem in self.text_elements:
-                if not is_connector_id(elem.content):
-                    continue
-                if '(' in elem.content:  # Skip ground connectors
-                    continue
-
+            # Skips ground connectors; only labels within 50 Y units can qualify
+            for elem in self.labels.plain_connector_labels_near_y(target_y - 50, target_y + 50):
                 y_dist = abs(elem.y - target_y)
                 x_dist = abs(elem.x - target_x)
 
@@ -242,7 +231,7 @@ class HorizontalColoredWireExtractor:
         Returns:
             Tuple of (connector_id, x, y) or None
         """
-        connectors_above = find_all_connectors_above_pin(pin_x, pin_y, self.text_elements)
+        connectors_above = find_all_connectors_above_pin(pin_x, pin_y, self.labels)
 
         if not connectors_above:
             return None
@@ -10,46 +10,54 @@ from models import Connection, TextElement, WireSpec
 from connector_finder import (
     is_connector_id,
     is_splice_point,
-    is_pin_number,
-    find_connector_above_pin
+    is_junction_pair,
+    find_connector_above_pin,
+    TextIndex
 )
 
 
 class HorizontalWireExtractor:
     """Extracts connections from horizontal wires with specifications."""
 
-    def __init__(self, text_elements: List[TextElement], wire_specs: List[WireSpec], polylines: List[str] = None):
+    def __init__(self, text_elements: List[TextElement], wire_specs: List[WireSpec], polylines: List[str] = None, labels: TextIndex = None):
         self.text_elements = text_elements
+        self.labels = labels if labels is not None else TextIndex(text_elements)  # Labels grouped by kind, classified once
+        # Parse polyline points once for both checks below
+        parsed_polylines = [self._parse_polyline_points(polyline) for polyline in polylines or []]
+
         # CRITICAL: Filter out wire specs on polyline horizontal segments
         # These should be handled by VerticalRoutingExtractor, not HorizontalWireExtractor
-        self.wire_specs = self._filter_wire_specs_on_polylines(wire_specs, polylines or [])
+        self.wire_specs = self._filter_wire_specs_on_polylines(wire_specs, parsed_polylines)
         self.seen_pin_pairs: Set[Tuple] = set()
 
         # CRITICAL: Identify splices on vertical polyline segments
         # These should NOT create horizontal wire connections
-        self.splices_on_vertical_segments = self._find_splices_on_vertical_segments(text_elements, polylines or [])
-
-    def _find_splices_on_vertical_segments(self, text_elements: List[TextElement], polylines: List[str]) -> Set[str]:
+        self.splices_on_vertical_segments = self._find_splices_on_vertical_segments(parsed_polylines)
+
+    @staticmethod
+    def _parse_polyline_points(polyline: str) -> List[Tuple[float, float]]:
+        """Parse a polyline points string ("x1,y1 x2,y2 ..."), skipping malformed points."""
+        parsed_points = []
+        for point in polyline.split():
+            if ',' in point:
+                parts = point.split(',')
+                if len(parts) == 2:
+                    try:
+                        px = float(parts[0])
+                        py = float(parts[1])
+                        parsed_points.append((px, py))
+                    except:
+                        pass
+        return parsed_points
+
+    def _find_splices_on_vertical_segments(self, parsed_polylines: List[List[Tuple[float, float]]]) -> Set[str]:
         """Find splice points that are on vertical polyline segments."""
         splices_on_vertical = set()
 
         # Get all splice positions
-        splices = [(e.content, e.x, e.y) for e in text_elements if is_splice_point(e.content)]
-
-        for polyline in polylines:
-            points = polyline.split()
-            parsed_points = []
-            for point in points:
-                if ',' in point:
-                    parts = point.split(',')
-                    if len(parts) == 2:
-                        try:
-                            px = float(parts[0])
-                            py = float(parts[1])
-                            parsed_points.append((px, py))
-                        except:
-                            pass
+        splices = [(e.content, e.x, e.y) for e in self.labels.splice_labels]
 
+        for parsed_points in parsed_polylines:
             # Check each segment
             for i in range(len(parsed_points) - 1):
                 x1, y1 = parsed_points[i]
@@ -64,7 +72,7 @@ class HorizontalWireExtractor:
 
         return splices_on_vertical
 
-    def _filter_wire_specs_on_polylines(self, wire_specs: List[WireSpec], polylines: List[str]) -> List[WireSpec]:
+    def _filter_wire_specs_on_polylines(self, wire_specs: List[WireSpec], parsed_polylines: List[List[Tuple[float, float]]]) -> List[WireSpec]:
         """
         Filter out wire specs that are on polyline horizontal segments.
 
@@ -77,30 +85,17 @@ class HorizontalWireExtractor:
 
         Args:
             wire_specs: List of all wire specifications
-            polylines: List of polyline point strings
+            parsed_polylines: Points of each polyline (see _parse_polyline_points)
 
         Returns:
             List of wire specs NOT on polyline segments
         """
-        if not polylines:
+        if not parsed_polylines:
             return wire_specs
 
-        # Parse all polylines and identify horizontal segments
+        # Identify horizontal segments of all polylines
         horizontal_segments = []
-        for polyline in polylines:
-            points = polyline.split()
-            parsed_points = []
-            for point in points:
-                if ',' in point:
-                    parts = point.split(',')
-                    if len(parts) == 2:
-                        try:
-                            px = float(parts[0])
-                            py = float(parts[1])
-                            parsed_points.append((px, py))
-                        except:
-                            pass
-
+        for parsed_points in parsed_polylines:
             # Find horizontal segments
             for i in range(len(parsed_points) - 1):
                 x1, y1 = parsed_points[i]
@@ -146,15 +141,15 @@ class HorizontalWireExtractor:
             List of Connection objects
         """
         connections = []
+        # (from_id, from_pin, to_id, to_pin) -> index of the first connection with those ends
+        first_index_by_ends = {}
 
         # Group wire specs by horizontal line (same Y coordinate within ±10 units)
         wire_lines = {}
         for wire_spec in self.wire_specs:
             # Round Y to nearest 10 to group wires on same horizontal line
             line_key = round(wire_spec.y / 10) * 10
-            if line_key not in wire_lines:
-                wire_lines[line_key] = []
-            wire_lines[line_key].append(wire_spec)
+            wire_lines.setdefault(line_key, []).append(wire_spec)
 
         # Process each horizontal line (or group of lines with specs at similar Y)
         for line_y, specs_on_line in wire_lines.items():
@@ -162,16 +157,16 @@ class HorizontalWireExtractor:
             # Wire specs are typically positioned directly above the wires they describe
             # First, find all connection points for this group
             connection_points = []
-            for elem in self.text_elements:
+            # Include: pins (digits or dash-separated), splice points, AND ground connectors (with parentheses)
+            # Only labels inside the group's Y band (±10 of its specs) can qualify
+            spec_ys = [spec.y for spec in specs_on_line]
+            for elem in self.labels.connection_labels_near_y(min(spec_ys) - 10, max(spec_ys) + 10):
                 # IMPORTANT: Check if element is within ±10 of ANY spec in the group
                 # (not just the first spec, since specs in a group can have different Y positions)
-                # Include: pins (digits or dash-separated), splice points, AND ground connectors (with parentheses)
-                is_ground_connector = is_connector_id(elem.content) and '(' in elem.content
-                if is_pin_number(elem.content) or is_splice_point(elem.content) or is_ground_connector:
-                    for spec in specs_on_line:
-                        if abs(elem.y - spec.y) < 10:
-                            connection_points.append(elem)
-                            break  # Don't add the same element multiple times
+                for spec in specs_on_line:
+                    if abs(elem.y - spec.y) < 10:
+                        connection_points.append(elem)
+                        break  # Don't add the same element multiple times
 
             if len(connection_points) < 2:
                 # Need at least 2 connection points
@@ -363,27 +358,15 @@ class HorizontalWireExtractor:
                         # Find connector labels between the connection points
                         connectors_between = [
                             elem.content
-                            for elem in self.text_elements
-                            if is_connector_id(elem.content) and not '(' in elem.content and  # Connector label (not ground)
-                               elem.content not in own_connectors and  # Not the pin's own connector
+                            # Connector labels (not ground) in the ±15 Y band
+                            for elem in self.labels.plain_connector_labels_near_y(pair_avg_y - 15, pair_avg_y + 15)
+                            if elem.content not in own_connectors and  # Not the pin's own connector
                                left_point.x < elem.x < right_point.x and  # Between in X
                                abs(elem.y - pair_avg_y) < 15  # On same horizontal level (within ±15 units)
                         ]
 
                         if connectors_between:
                             # Allow passing through junction pair labels (e.g., MH2FL/FL2MH share pins)
-                            def is_junction_pair(conn1, conn2):
-                                """Check if two connectors are junction pairs (PREFIX1+2+PREFIX2 ↔ PREFIX2+2+PREFIX1)."""
-                                if '2' not in conn1 or '2' not in conn2:
-                                    return False
-                                # Split on '2' and check if they're mirrors
-                                parts1 = conn1.split('2', 1)
-                                parts2 = conn2.split('2', 1)
-                                if len(parts1) == 2 and len(parts2) == 2:
-                                    # Check if parts are swapped: (A,B) vs (B,A)
-                                    return parts1[0] == parts2[1] and parts1[1] == parts2[0]
-                                return False
-
                             all_are_junction_pairs = all(
                                 is_junction_pair(conn, right_id) or is_junction_pair(conn, left_id)
                                 for conn in connectors_between
@@ -408,11 +391,10 @@ class HorizontalWireExtractor:
                                     # No wire spec between connectors - skip this connection
                                     continue
 
-                    # Create a unique key for this connection
-                    connection_key = tuple(sorted([
-                        (left_id, left_pin, left_point.x, left_point.y),
-                        (right_id, right_pin, right_point.x, right_point.y)
-                    ]))
+                    # Create a unique key for this connection (the two ends in sorted order)
+                    left_end = (left_id, left_pin, left_point.x, left_point.y)
+                    right_end = (right_id, right_pin, right_point.x, right_point.y)
+                    connection_key = (left_end, right_end) if left_end <= right_end else (right_end, left_end)
 
                     connection = Connection(
                         from_id=left_id,
@@ -426,13 +408,13 @@ class HorizontalWireExtractor:
 
                     # CRITICAL: If this connection already exists, keep the one with spec BETWEEN the pins
                     if connection_key in self.seen_pin_pairs:
-                        # Find the existing connection
-                        existing_conn_idx = None
-                        for idx, conn in enumerate(connections):
-                            if (sorted([(conn.from_id, conn.from_pin, left_point.x, left_point.y),
-                                        (conn.to_id, conn.to_pin, right_point.x, right_point.y)]) == list(connection_key)):
-                                existing_conn_idx = idx
-                                break
+                        # Find the existing connection: the first one with the same ends
+                        # (either direction when both points share a position)
+                        existing_conn_idx = first_index_by_ends.get((left_id, left_pin, right_id, right_pin))
+                        if left_point.x == right_point.x and left_point.y == right_point.y:
+                            swapped_idx = first_index_by_ends.get((right_id, right_pin, left_id, left_pin))
+                            if swapped_idx is not None and (existing_conn_idx is None or swapped_idx < existing_conn_idx):
+                                existing_conn_idx = swapped_idx
 
                         # If we found the existing connection, check if new one has spec between
                         if existing_conn_idx is not None and len(between_specs) > 0:
@@ -442,6 +424,7 @@ class HorizontalWireExtractor:
                         continue
 
                     self.seen_pin_pairs.add(connection_key)
+                    first_index_by_ends.setdefault((left_id, left_pin, right_id, right_pin), len(connections))
                     connections.append(connection)
 
         return connections
@@ -472,7 +455,7 @@ class HorizontalWireExtractor:
         # It's a pin - find connector above it
         # If destination_x is provided, use it to pick the junction closer to the destination
         conn_result = find_connector_above_pin(
-            point.x, point.y, self.text_elements,
+            point.x, point.y, self.labels,
             prefer_as_source=prefer_as_source,
             source_x=source_x,
             destination_x=destination_x
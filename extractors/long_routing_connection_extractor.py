@@ -7,7 +7,6 @@ outgoing connections for that color, it must route to another splice with the sa
 
 This handles long vertical/diagonal routing wires that are not captured by polylines or paths.
 """
-import math
 from typing import List
 from models import Connection, TextElement
 from connector_finder import is_splice_point
@@ -83,14 +82,16 @@ class LongRoutingConnectionExtractor:
             for conn in self.existing_connections
         )
 
-    def _distance(self, sp1: str, sp2: str) -> float:
-        """Calculate Euclidean distance between two splices."""
+    def _distance_sq(self, sp1: str, sp2: str) -> float:
+        """Calculate squared Euclidean distance between two splices (for comparisons only)."""
         if sp1 not in self.splice_positions or sp2 not in self.splice_positions:
             return float('inf')
 
         pos1 = self.splice_positions[sp1]
         pos2 = self.splice_positions[sp2]
-        return math.sqrt((pos1[0] - pos2[0])**2 + (pos1[1] - pos2[1])**2)
+        dx = pos1[0] - pos2[0]
+        dy = pos1[1] - pos2[1]
+        return dx * dx + dy * dy
 
     def extract_connections(self) -> List[Connection]:
         """
@@ -167,11 +168,11 @@ class LongRoutingConnectionExtractor:
                         continue
 
                     # Calculate distance and direction
-                    dist = self._distance(source_sp, dest_sp)
+                    dist_sq = self._distance_sq(source_sp, dest_sp)
 
                     # CRITICAL: Only consider long-distance routing (> 400 units)
                     # This filters out local junctions and focuses on cross-diagram routing
-                    if dist <= 400:
+                    if dist_sq <= 400 * 400:
                         continue
 
                     # Calculate direction vector
@@ -185,18 +186,18 @@ class LongRoutingConnectionExtractor:
                     if abs(delta_y) <= 200:
                         continue
 
-                    candidates.append((dest_sp, dist, delta_x, delta_y))
+                    candidates.append((dest_sp, dist_sq, delta_x, delta_y))
 
                 if not candidates:
                     continue
 
-                # Sort candidates by distance (prefer closer ones)
+                # Sort candidates by (squared) distance (prefer closer ones)
                 candidates.sort(key=lambda x: x[1])
 
                 # Create connection to the closest matching splice
                 # Parse wire_key to get diameter and color
                 diameter, color = wire_key.split(',')
-                dest_sp, dist, delta_x, delta_y = candidates[0]
+                dest_sp, dist_sq, delta_x, delta_y = candidates[0]
 
                 # Mark this pair as seen to prevent reverse connection
                 pair_key = tuple(sorted([source_sp, dest_sp]))
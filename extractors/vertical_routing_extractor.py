@@ -4,7 +4,6 @@ Vertical routing connection extractor.
 Extracts connections from vertical routing arrows (st17 polylines) and st1 path routing wires.
 Handles multi-segment polylines with intermediate splices and tracks pass-through splices.
 """
-import math
 from typing import List, Tuple
 from models import Connection, TextElement, WireSpec, ConnectionPoint
 from connector_finder import (
@@ -13,7 +12,9 @@ from connector_finder import (
     is_pin_number,
     find_connector_above_pin,
     find_all_connectors_above_pin,
-    find_nearest_connection_point
+    find_nearest_connection_point,
+    get_horizontal_source_pins,
+    TextIndex
 )
 from .base_extractor import BaseExtractor, deduplicate_connections
 
@@ -21,23 +22,19 @@ from .base_extractor import BaseExtractor, deduplicate_connections
 class VerticalRoutingExtractor(BaseExtractor):
     """Extracts connections from vertical routing arrows (st17 polylines) and st1 path routing wires."""
 
-    def __init__(self, polylines: List[str], st1_paths: List[str], text_elements: List[TextElement], wire_specs: List[WireSpec] = None, horizontal_connections: List[Connection] = None):
+    def __init__(self, polylines: List[str], st1_paths: List[str], text_elements: List[TextElement], wire_specs: List[WireSpec] = None, horizontal_connections: List[Connection] = None, labels: TextIndex = None):
         # Initialize base class
         super().__init__(text_elements, wire_specs or [])
 
         self.polylines = polylines
         self.st1_paths = st1_paths
+        self.labels = labels if labels is not None else TextIndex(text_elements)  # Labels grouped by kind, classified once
 
         # Calculate component bounds once (for filtering external routing wires)
         # Only include: pins (regular or dash-separated), connector IDs, splice points
         # Exclude: descriptive labels like "2Row RH Seat Memory Button Backlight"
-        def is_component_element(content: str) -> bool:
-            return (is_pin_number(content) or  # Pins (regular or dash-separated)
-                   is_connector_id(content) or  # Connector IDs
-                   is_splice_point(content))  # Splice points (SP001, SP_CUSTOM_001)
-
-        component_xs = [e.x for e in text_elements if is_component_element(e.content)]
-        component_ys = [e.y for e in text_elements if is_component_element(e.content)]
+        component_xs = [e.x for e in self.labels.component_labels]
+        component_ys = [e.y for e in self.labels.component_labels]
 
         if component_xs and component_ys:
             # Add 20-unit margin for boundary tolerance
@@ -51,6 +48,8 @@ class VerticalRoutingExtractor(BaseExtractor):
             self.max_x = self.max_y = float('inf')
 
         self.horizontal_connections = horizontal_connections or []
+        # Source pins of the horizontal wires, built once for the endpoint lookups
+        self.horizontal_source_pins = get_horizontal_source_pins(self.horizontal_connections)
 
         # Build a set of (connector_id, pin) tuples that already have horizontal wire connections
         # Only track PINS (not splice points), as splice points can have multiple connections
@@ -151,21 +150,23 @@ class VerticalRoutingExtractor(BaseExtractor):
                 for px, py in path_points:
                     # Find nearest connector label or pin/splice
                     nearest_connector = None
-                    min_dist = 15  # max distance (tight threshold to match only true endpoints, not incidental nearby labels)
-
-                    for elem in self.text_elements:
-                        dist = math.sqrt((elem.x - px)**2 + (elem.y - py)**2)
-                        if dist < min_dist:
-                            # Accept: connector IDs, pins (regular or dash-separated), or splice points
-                            if is_connector_id(elem.content) or is_pin_number(elem.content) or is_splice_point(elem.content):
-                                min_dist = dist
-                                nearest_connector = elem
+                    max_dist = 15  # max distance (tight threshold to match only true endpoints, not incidental nearby labels)
+                    min_dist_sq = max_dist * max_dist  # Compare squared distances
+
+                    # Accept: connector IDs, pins (regular or dash-separated), or splice points
+                    for elem in self.labels.component_labels_near_x(px, max_dist):
+                        dx = elem.x - px
+                        dy = elem.y - py
+                        dist_sq = dx * dx + dy * dy
+                        if dist_sq < min_dist_sq:
+                            min_dist_sq = dist_sq
+                            nearest_connector = elem
 
                     if nearest_connector:
                         # If it's a pin, find the connector above it
                         if is_pin_number(nearest_connector.content):
                             conn_result = find_connector_above_pin(
-                                nearest_connector.x, nearest_connector.y, self.text_elements,
+                                nearest_connector.x, nearest_connector.y, self.labels,
                                 prefer_as_source=False
                             )
                             if conn_result:
@@ -189,7 +190,7 @@ class VerticalRoutingExtractor(BaseExtractor):
                                     if existing_wire_spec != polyline_wire_spec:
                                         # Try to find an alternative connector (not the primary one)
                                         all_connectors = find_all_connectors_above_pin(
-                                            nearest_connector.x, nearest_connector.y, self.text_elements
+                                            nearest_connector.x, nearest_connector.y, self.labels
                                         )
                                         # Filter out the primary connector and use the next available one
                                         # Note: find_all_connectors_above_pin returns (y_distance, connector_id, x, y)
@@ -248,10 +249,12 @@ class VerticalRoutingExtractor(BaseExtractor):
 
             # Find nearest connection points to both endpoints (for non-rectangular polylines)
             # Pass horizontal_connections to filter out pins already in use
-            endpoint1 = find_nearest_connection_point(start_x, start_y, self.text_elements, max_distance=100,
-                                                     horizontal_connections=self.horizontal_connections)
-            endpoint2 = find_nearest_connection_point(end_x, end_y, self.text_elements, max_distance=100,
-                                                     horizontal_connections=self.horizontal_connections)
+            endpoint1 = find_nearest_connection_point(start_x, start_y, self.labels, max_distance=100,
+                                                     horizontal_connections=self.horizontal_connections,
+                                                     horizontal_source_pins=self.horizontal_source_pins)
+            endpoint2 = find_nearest_connection_point(end_x, end_y, self.labels, max_distance=100,
+                                                     horizontal_connections=self.horizontal_connections,
+                                                     horizontal_source_pins=self.horizontal_source_pins)
 
             if not endpoint1 or not endpoint2:
                 continue
@@ -293,10 +296,7 @@ class VerticalRoutingExtractor(BaseExtractor):
                     x2, y2 = parsed_points[i + 1]
 
                     # Check all splice points to see if any are ON this segment
-                    for elem in self.text_elements:
-                        if not is_splice_point(elem.content):
-                            continue
-
+                    for elem in self.labels.splice_labels:
                         sx, sy = elem.x, elem.y
 
                         # Check if splice is on this line segment
@@ -312,7 +312,7 @@ class VerticalRoutingExtractor(BaseExtractor):
                                 is_on_segment = True
 
                         if is_on_segment:
-                            candidate_splice = find_nearest_connection_point(sx, sy, self.text_elements, max_distance=20)
+                            candidate_splice = find_nearest_connection_point(sx, sy, self.labels, max_distance=20)
                             # CRITICAL: Don't treat endpoints as intermediate splices
                             if candidate_splice and is_splice_point(candidate_splice.connector_id):
                                 # Skip if this splice is one of the endpoints
@@ -332,7 +332,7 @@ class VerticalRoutingExtractor(BaseExtractor):
                 if not all_intermediate_splices:
                     for i in range(1, len(parsed_points) - 1):  # Skip first and last
                         px, py = parsed_points[i]
-                        intermediate = find_nearest_connection_point(px, py, self.text_elements, max_distance=20)
+                        intermediate = find_nearest_connection_point(px, py, self.labels, max_distance=20)
                         if intermediate and is_splice_point(intermediate.connector_id):
                             if intermediate not in all_intermediate_splices:
                                 all_intermediate_splices.append(intermediate)
@@ -389,15 +389,17 @@ class VerticalRoutingExtractor(BaseExtractor):
 
                             # Find nearest splice point in chain (could be before or after)
                             nearest_splice = None
-                            min_distance = float('inf')
+                            min_distance_sq = float('inf')
 
                             for j in range(len(chain)):
                                 if i == j or not is_splice_point(chain[j].connector_id):
                                     continue
 
-                                dist = math.sqrt((current.x - chain[j].x)**2 + (current.y - chain[j].y)**2)
-                                if dist < min_distance:
-                                    min_distance = dist
+                                dx = current.x - chain[j].x
+                                dy = current.y - chain[j].y
+                                dist_sq = dx * dx + dy * dy
+                                if dist_sq < min_distance_sq:
+                                    min_distance_sq = dist_sq
                                     nearest_splice = chain[j]
 
                             # Connect this pin to the nearest splice
@@ -455,8 +457,9 @@ class VerticalRoutingExtractor(BaseExtractor):
                             both_splices = (is_splice_point(from_point.connector_id) and
                                           is_splice_point(to_point.connector_id))
                             if both_splices:
-                                dist = math.sqrt((from_point.x - to_point.x)**2 + (from_point.y - to_point.y)**2)
-                                if dist < 400:
+                                dx = from_point.x - to_point.x
+                                dy = from_point.y - to_point.y
+                                if dx * dx + dy * dy < 400 * 400:  # Closer than 400 units
                                     continue
 
                             connections.append(Connection(
@@ -526,8 +529,9 @@ class VerticalRoutingExtractor(BaseExtractor):
             # Long routing connections (>= 400 units) are handled by LongRoutingConnectionExtractor
             # which uses wire color flow analysis to verify they're real connections.
             if ep1_is_splice and ep2_is_splice:
-                dist = math.sqrt((endpoint1.x - endpoint2.x)**2 + (endpoint1.y - endpoint2.y)**2)
-                if dist < 400:
+                dx = endpoint1.x - endpoint2.x
+                dy = endpoint1.y - endpoint2.y
+                if dx * dx + dy * dy < 400 * 400:  # Closer than 400 units
                     continue
 
             # Create connection
@@ -557,7 +561,7 @@ class VerticalRoutingExtractor(BaseExtractor):
                 px, py = path_points[i]
 
                 # Check for connection points AT this path point
-                cp = find_nearest_connection_point(px, py, self.text_elements, max_distance=100)
+                cp = find_nearest_connection_point(px, py, self.labels, max_distance=100)
                 if cp:
                     # Skip ground connectors (handled by ground extractor)
                     if is_connector_id(cp.connector_id) and '(' in cp.connector_id:
@@ -572,12 +576,8 @@ class VerticalRoutingExtractor(BaseExtractor):
                 if i < len(path_points) - 1:
                     next_px, next_py = path_points[i + 1]
 
-                    # Check all text elements to see if any are on/near this line segment
-                    for elem in self.text_elements:
-                        # Check if element is a connection point (pin or splice)
-                        if not (is_pin_number(elem.content) or is_splice_point(elem.content)):
-                            continue
-
+                    # Check all connection points (pins and splices) to see if any are on/near this line segment
+                    for elem in self.labels.pin_splice_labels:
                         # Check if point is near the line segment
                         ex, ey = elem.x, elem.y
 
@@ -591,7 +591,7 @@ class VerticalRoutingExtractor(BaseExtractor):
                                 min_x, max_x = min(px, next_px), max(px, next_px)
                                 if min_x - 5 < ex < max_x + 5:  # Between endpoints horizontally
                                     # This element is on the line segment
-                                    cp = find_nearest_connection_point(ex, ey, self.text_elements, max_distance=20)
+                                    cp = find_nearest_connection_point(ex, ey, self.labels, max_distance=20)
                                     if cp:
                                         if is_connector_id(cp.connector_id) and '(' in cp.connector_id:
                                             continue
@@ -603,7 +603,7 @@ class VerticalRoutingExtractor(BaseExtractor):
                             if abs(ex - px) < 15:  # Within 15 units horizontally
                                 min_y, max_y = min(py, next_py), max(py, next_py)
                                 if min_y - 5 < ey < max_y + 5:  # Between endpoints vertically
-                                    cp = find_nearest_connection_point(ex, ey, self.text_elements, max_distance=20)
+                                    cp = find_nearest_connection_point(ex, ey, self.labels, max_distance=20)
                                     if cp:
                                         if is_connector_id(cp.connector_id) and '(' in cp.connector_id:
                                             continue
@@ -711,8 +711,9 @@ class VerticalRoutingExtractor(BaseExtractor):
                 both_splices = (is_splice_point(source.connector_id) and
                               is_splice_point(dest.connector_id))
                 if both_splices:
-                    dist = math.sqrt((source.x - dest.x)**2 + (source.y - dest.y)**2)
-                    if dist < 400:
+                    dx = source.x - dest.x
+                    dy = source.y - dest.y
+                    if dx * dx + dy * dy < 400 * 400:  # Closer than 400 units
                         continue
 
                 # CRITICAL: Validate wire color consistency for splice connections
@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class TextElement:
     """Represents a text element from the SVG."""
     content: str
@@ -13,7 +13,7 @@ class TextElement:
     y: float
 
 
-@dataclass
+@dataclass(slots=True)
 class ConnectionPoint:
     """Represents a connection point (connector with optional pin)."""
     connector_id: str
@@ -22,7 +22,7 @@ class ConnectionPoint:
     y: float
 
 
-@dataclass
+@dataclass(slots=True)
 class Connection:
     """Represents a wire connection between two points."""
     from_id: str
@@ -94,7 +94,7 @@ class IDGenerator:
         self._generated_ids = {}
 
 
-@dataclass
+@dataclass(slots=True)
 class WireSpec:
     """Represents a wire specification found in the diagram."""
     diameter: str
@@ -103,7 +103,7 @@ class WireSpec:
     y: float
 
 
-@dataclass
+@dataclass(slots=True)
 class HorizontalWireSegment:
     """Represents a horizontal wire segment in a grid routing system."""
     x1: float
@@ -113,7 +113,7 @@ class HorizontalWireSegment:
     color_name: str  # Human-readable color like 'green', 'red', etc.
 
 
-@dataclass
+@dataclass(slots=True)
 class VerticalWireSegment:
     """Represents a vertical wire segment in a grid routing system."""
     x: float
@@ -2,24 +2,56 @@
 SVG parsing utilities for circuit diagrams.
 """
 import re
-import math
+import sys
+from bisect import bisect_left, bisect_right
 import xml.etree.ElementTree as ET
-from typing import List, Tuple
+from typing import Dict, List, Tuple, Union
 from models import TextElement, WireSpec, IDGenerator
 
+# Parsers accept a path or a root element already parsed by parse_svg_once()
+SvgSource = Union[str, ET.Element]
 
-def parse_text_elements(svg_file: str) -> List[TextElement]:
+# Patterns used per element/path, compiled once
+_RE_MATRIX_TRANSLATE = re.compile(r'matrix\([^\)]+\s+([\d.]+)\s+([\d.]+)\)')  # translate part of a transform
+_RE_OPTION_LABEL = re.compile(r'^\([A-Z]+[+-]\)$')  # connector option label, e.g. (XR-)
+_RE_MOVE_TO = re.compile(r'M([\d.]+),([\d.]+)')  # leading absolute moveto
+_RE_PATH_COMMAND = re.compile(r'[MmLlHhVvCcSsQqTtAaZz][^MmLlHhVvCcSsQqTtAaZz]*')
+_RE_NUMBER = re.compile(r'-?\d+\.?\d*')
+_RE_HORIZONTAL_TO = re.compile(r'[Hh]([\d.]+)')
+_RE_CURVE_ARGS = re.compile(r'c([\d.,\s]+)')
+
+
+def parse_svg_once(svg_file: str) -> ET.Element:
     """
-    Parse all text elements from SVG file.
+    Parse an SVG file once so every parse_* function can share the tree.
 
     Args:
         svg_file: Path to SVG file
 
+    Returns:
+        Root element of the parsed SVG
+    """
+    return ET.parse(svg_file).getroot()
+
+
+def _svg_root(svg_file: SvgSource) -> ET.Element:
+    """Return the root element for a path or an already-parsed root."""
+    if isinstance(svg_file, ET.Element):
+        return svg_file
+    return parse_svg_once(svg_file)
+
+
+def parse_text_elements(svg_file: SvgSource) -> List[TextElement]:
+    """
+    Parse all text elements from SVG file.
+
+    Args:
+        svg_file: Path to SVG file, or root element from parse_svg_once()
+
     Returns:
         List of TextElement objects
     """
-    tree = ET.parse(svg_file)
-    root = tree.getroot()
+    root = _svg_root(svg_file)
 
     text_elements = []
 
@@ -32,11 +64,12 @@ def parse_text_elements(svg_file: str) -> List[TextElement]:
 
         # Extract coordinates from transform matrix
         # Format: "matrix(1 0 0 1 237.3564 331.6939)"
-        match = re.search(r'matrix\([^\)]+\s+([\d.]+)\s+([\d.]+)\)', transform)
+        match = _RE_MATRIX_TRANSLATE.search(transform)
         if match:
             x = float(match.group(1))
             y = float(match.group(2))
-            text_elements.append(TextElement(content.strip(), x, y))
+            # Interned: labels become connector ids/pins used as set and dict keys
+            text_elements.append(TextElement(sys.intern(content.strip()), x, y))
 
     return text_elements
 
@@ -65,7 +98,7 @@ def merge_multiline_connectors(text_elements: List[TextElement]) -> List[TextEle
 
     for i, elem in enumerate(text_elements):
         # Check if this is an option label like "(XR-)", "(XR+)"
-        if re.match(r'^\([A-Z]+[+-]\)$', elem.content):
+        if _RE_OPTION_LABEL.match(elem.content):
             # Find connector to the left (within 30 X units, same Y level ±3 units)
             for j, other in enumerate(text_elements):
                 if j == i:
@@ -98,7 +131,7 @@ def merge_multiline_connectors(text_elements: List[TextElement]) -> List[TextEle
                 option_elem = text_elements[option_idx]
                 # Merge: create new element with combined content
                 combined_content = f"{elem.content} {option_elem.content}"
-                horizontally_merged.append(TextElement(combined_content, elem.x, elem.y))
+                horizontally_merged.append(TextElement(sys.intern(combined_content), elem.x, elem.y))
                 processed_indices.add(i)
                 processed_indices.add(option_idx)
                 continue
@@ -156,7 +189,7 @@ def merge_multiline_connectors(text_elements: List[TextElement]) -> List[TextEle
                             # Important for find_connector_above_pin "between" logic
                             use_x = (elem.x + other.x) / 2
 
-                            final_merged.append(TextElement(multiline_content, use_x, use_y))
+                            final_merged.append(TextElement(sys.intern(multiline_content), use_x, use_y))
                             processed_indices.add(i)
                             processed_indices.add(j)
                             paired = True
@@ -174,7 +207,7 @@ def merge_multiline_connectors(text_elements: List[TextElement]) -> List[TextEle
     return final_merged
 
 
-def parse_splice_dots(svg_file: str) -> List[Tuple[float, float]]:
+def parse_splice_dots(svg_file: SvgSource) -> List[Tuple[float, float]]:
     """
     Parse splice point dots from SVG.
 
@@ -182,19 +215,16 @@ def parse_splice_dots(svg_file: str) -> List[Tuple[float, float]]:
     Pattern: M x,y c ... (short path with multiple 'c' commands forming a circle)
 
     Args:
-        svg_file: Path to SVG file
+        svg_file: Path to SVG file, or root element from parse_svg_once()
 
     Returns:
         List of (x, y) coordinates
     """
-    tree = ET.parse(svg_file)
-    root = tree.getroot()
+    root = _svg_root(svg_file)
 
     dots = []
 
     for path in root.iter('{http://www.w3.org/2000/svg}path'):
-        d = path.get('d', '')
-
         # Splice dots are circles with these characteristics:
         # 1. No class attribute (real splice dots have no styling)
         # 2. Short path (< 200 chars)
@@ -203,9 +233,11 @@ def parse_splice_dots(svg_file: str) -> List[Tuple[float, float]]:
 
         # CRITICAL: Only match paths with no class attribute
         # This excludes arrowheads (st10), routing arrows (st17), and other styled elements
+        # (checked before reading the path data at all)
         if path.get('class'):
             continue
 
+        d = path.get('d', '')
         if len(d) > 200:
             continue
 
@@ -216,7 +248,7 @@ def parse_splice_dots(svg_file: str) -> List[Tuple[float, float]]:
             continue
 
         # Extract starting coordinates
-        match = re.match(r'M([\d.]+),([\d.]+)', d)
+        match = _RE_MOVE_TO.match(d)
         if match:
             x = float(match.group(1))
             y = float(match.group(2))
@@ -225,18 +257,17 @@ def parse_splice_dots(svg_file: str) -> List[Tuple[float, float]]:
     return dots
 
 
-def parse_wire_lines(svg_file: str) -> List[Tuple[float, float, float, float]]:
+def parse_wire_lines(svg_file: SvgSource) -> List[Tuple[float, float, float, float]]:
     """
     Parse horizontal wire lines from SVG.
 
     Args:
-        svg_file: Path to SVG file
+        svg_file: Path to SVG file, or root element from parse_svg_once()
 
     Returns:
         List of (x1, y1, x2, y2) tuples
     """
-    tree = ET.parse(svg_file)
-    root = tree.getroot()
+    root = _svg_root(svg_file)
 
     lines = []
 
@@ -252,18 +283,17 @@ def parse_wire_lines(svg_file: str) -> List[Tuple[float, float, float, float]]:
     return lines
 
 
-def parse_st17_polylines(svg_file: str) -> List[str]:
+def parse_st17_polylines(svg_file: SvgSource) -> List[str]:
     """
     Parse st17 polyline elements (vertical routing arrows).
 
     Args:
-        svg_file: Path to SVG file
+        svg_file: Path to SVG file, or root element from parse_svg_once()
 
     Returns:
         List of points strings (e.g., "x1,y1 x2,y2 x3,y3")
     """
-    tree = ET.parse(svg_file)
-    root = tree.getroot()
+    root = _svg_root(svg_file)
 
     polylines = []
 
@@ -276,7 +306,7 @@ def parse_st17_polylines(svg_file: str) -> List[str]:
     return polylines
 
 
-def parse_all_polylines(svg_file: str) -> List[str]:
+def parse_all_polylines(svg_file: SvgSource) -> List[str]:
     """
     Parse ALL polyline elements (for routing connections).
 
@@ -287,13 +317,12 @@ def parse_all_polylines(svg_file: str) -> List[str]:
     that represent the same wire but with slightly different endpoints.
 
     Args:
-        svg_file: Path to SVG file
+        svg_file: Path to SVG file, or root element from parse_svg_once()
 
     Returns:
         List of points strings (e.g., "x1,y1 x2,y2 x3,y3")
     """
-    tree = ET.parse(svg_file)
-    root = tree.getroot()
+    root = _svg_root(svg_file)
 
     polylines = []
 
@@ -305,6 +334,7 @@ def parse_all_polylines(svg_file: str) -> List[str]:
     # Deduplicate near-identical polylines
     # Some SVGs have decorative outline pairs (e.g., st20/st21) with same path but endpoints differ by ~1 unit
     deduplicated = []
+    deduplicated_parsed = []  # Parsed points of each kept polyline (parsed once, not per comparison)
     for points_str in polylines:
         # Parse points
         parsed = []
@@ -318,13 +348,7 @@ def parse_all_polylines(svg_file: str) -> List[str]:
 
         # Check if this polyline is a near-duplicate of an existing one
         is_duplicate = False
-        for existing_str in deduplicated:
-            existing_parsed = []
-            for p in existing_str.split():
-                if ',' in p:
-                    x, y = p.split(',')
-                    existing_parsed.append((float(x), float(y)))
-
+        for existing_parsed in deduplicated_parsed:
             # Compare: same length, same start, same intermediate points, close end
             if len(parsed) == len(existing_parsed):
                 # Check start point (within 2 units)
@@ -351,22 +375,22 @@ def parse_all_polylines(svg_file: str) -> List[str]:
 
         if not is_duplicate:
             deduplicated.append(points_str)
+            deduplicated_parsed.append(parsed)
 
     return deduplicated
 
 
-def parse_st17_paths(svg_file: str) -> List[str]:
+def parse_st17_paths(svg_file: SvgSource) -> List[str]:
     """
     Parse st17 path elements (ground connection arrows).
 
     Args:
-        svg_file: Path to SVG file
+        svg_file: Path to SVG file, or root element from parse_svg_once()
 
     Returns:
         List of d attribute strings
     """
-    tree = ET.parse(svg_file)
-    root = tree.getroot()
+    root = _svg_root(svg_file)
 
     paths = []
 
@@ -379,18 +403,17 @@ def parse_st17_paths(svg_file: str) -> List[str]:
     return paths
 
 
-def parse_st1_paths(svg_file: str) -> List[str]:
+def parse_st1_paths(svg_file: SvgSource) -> List[str]:
     """
     Parse st1 path elements (white routing wires).
 
     Args:
-        svg_file: Path to SVG file
+        svg_file: Path to SVG file, or root element from parse_svg_once()
 
     Returns:
         List of d attribute strings
     """
-    tree = ET.parse(svg_file)
-    root = tree.getroot()
+    root = _svg_root(svg_file)
 
     paths = []
 
@@ -403,12 +426,12 @@ def parse_st1_paths(svg_file: str) -> List[str]:
     return paths
 
 
-def parse_routing_paths(svg_file: str, path_classes: List[str] = None, only_l_shaped: bool = True) -> List[str]:
+def parse_routing_paths(svg_file: SvgSource, path_classes: List[str] = None, only_l_shaped: bool = True) -> List[str]:
     """
     Parse routing path elements by class names.
 
     Args:
-        svg_file: Path to SVG file
+        svg_file: Path to SVG file, or root element from parse_svg_once()
         path_classes: List of class names to parse (e.g., ['st3', 'st4'])
                      If None, defaults to ['st3', 'st4']
         only_l_shaped: If True, only return paths with vertical segments (v/V commands)
@@ -420,25 +443,46 @@ def parse_routing_paths(svg_file: str, path_classes: List[str] = None, only_l_sh
     if path_classes is None:
         path_classes = ['st3', 'st4']
 
-    tree = ET.parse(svg_file)
-    root = tree.getroot()
+    return parse_routing_path_groups(svg_file, {'paths': (path_classes, only_l_shaped)})['paths']
 
-    paths = []
+
+def parse_routing_path_groups(svg_file: SvgSource, groups: Dict[str, Tuple[List[str], bool]]) -> Dict[str, List[str]]:
+    """
+    Parse several groups of routing path elements in a single pass over the SVG.
+
+    Args:
+        svg_file: Path to SVG file, or root element from parse_svg_once()
+        groups: Mapping of group name -> (path_classes, only_l_shaped), with the
+                same meaning as the parse_routing_paths arguments
+
+    Returns:
+        Mapping of group name -> list of d attribute strings (document order)
+    """
+    root = _svg_root(svg_file)
+
+    result = {name: [] for name in groups}
+    # class name -> [(output list, only_l_shaped)] for every group that wants it
+    class_targets = {}
+    for name, (path_classes, only_l_shaped) in groups.items():
+        # A class listed twice in one group must still match each path only once
+        for cls in dict.fromkeys(path_classes):
+            class_targets.setdefault(cls, []).append((result[name], only_l_shaped))
 
     for path in root.iter('{http://www.w3.org/2000/svg}path'):
-        cls = path.get('class', '')
-        if cls in path_classes:
-            d = path.get('d', '').strip()
-            if d:
-                # Filter: only include L-shaped paths (those with vertical segments)
-                # This prevents duplicates from horizontal-only st3 paths
-                if only_l_shaped:
-                    if 'v' in d or 'V' in d:
-                        paths.append(d)
-                else:
-                    paths.append(d)
+        targets = class_targets.get(path.get('class', ''))
+        if not targets:
+            continue
+        d = path.get('d', '').strip()
+        if not d:
+            continue
+        for paths, only_l_shaped in targets:
+            # Filter: only include L-shaped paths (those with vertical segments)
+            # This prevents duplicates from horizontal-only st3 paths
+            if only_l_shaped and 'v' not in d and 'V' not in d:
+                continue
+            paths.append(d)
 
-    return paths
+    return result
 
 
 def extract_path_all_points(d_attr: str) -> list:
@@ -453,10 +497,8 @@ def extract_path_all_points(d_attr: str) -> list:
     Returns:
         List of (x, y) tuples, or empty list if parsing fails
     """
-    import re
-
     try:
-        commands = re.findall(r'[MmLlHhVvCcSsQqTtAaZz][^MmLlHhVvCcSsQqTtAaZz]*', d_attr)
+        commands = _RE_PATH_COMMAND.findall(d_attr)
 
         if not commands:
             return []
@@ -467,7 +509,7 @@ def extract_path_all_points(d_attr: str) -> list:
             return []
 
         # Extract start coordinates from M command
-        coords = re.findall(r'-?\d+\.?\d*', first_cmd)
+        coords = _RE_NUMBER.findall(first_cmd)
         if len(coords) < 2:
             return []
 
@@ -479,7 +521,7 @@ def extract_path_all_points(d_attr: str) -> list:
         # Process subsequent commands
         for cmd_str in commands[1:]:
             cmd = cmd_str[0]
-            params = re.findall(r'-?\d+\.?\d*', cmd_str[1:])
+            params = _RE_NUMBER.findall(cmd_str[1:])
 
             if cmd == 'M':  # Absolute moveto
                 if len(params) >= 2:
@@ -547,11 +589,9 @@ def extract_path_endpoints(d_attr: str) -> tuple:
     Returns:
         Tuple of (start_x, start_y, end_x, end_y) or None if parsing fails
     """
-    import re
-
     try:
         # Remove extra whitespace and split by command letters
-        commands = re.findall(r'[MmLlHhVvCcSsQqTtAaZz][^MmLlHhVvCcSsQqTtAaZz]*', d_attr)
+        commands = _RE_PATH_COMMAND.findall(d_attr)
 
         if not commands:
             return None
@@ -562,7 +602,7 @@ def extract_path_endpoints(d_attr: str) -> tuple:
             return None
 
         # Extract start coordinates from M command
-        coords = re.findall(r'-?\d+\.?\d*', first_cmd)
+        coords = _RE_NUMBER.findall(first_cmd)
         if len(coords) < 2:
             return None
 
@@ -572,7 +612,7 @@ def extract_path_endpoints(d_attr: str) -> tuple:
         # Process subsequent commands to find end point
         for cmd_str in commands[1:]:
             cmd = cmd_str[0]
-            params = re.findall(r'-?\d+\.?\d*', cmd_str[1:])
+            params = _RE_NUMBER.findall(cmd_str[1:])
 
             if cmd == 'M':  # Absolute moveto
                 if len(params) >= 2:
@@ -635,7 +675,8 @@ def extract_wire_specs(text_elements: List[TextElement]) -> List[WireSpec]:
             parsed = parse_wire_spec(elem.content)
             if parsed:
                 diameter, color = parsed
-                wire_specs.append(WireSpec(diameter, color, elem.x, elem.y))
+                # Interned like label text: every connection on the wire shares them
+                wire_specs.append(WireSpec(sys.intern(diameter), sys.intern(color), elem.x, elem.y))
 
     return wire_specs
 
@@ -661,18 +702,28 @@ def map_splice_positions_to_dots(
     """
     from connector_finder import is_splice_point
 
+    # Dots sorted by X (ties by original order), so each label only scans the
+    # dots within max_distance in X instead of every dot
+    sorted_dots = sorted((dot_x, i, dot_y) for i, (dot_x, dot_y) in enumerate(dots))
+    sorted_xs = [dot[0] for dot in sorted_dots]
+    max_distance_sq = max_distance * max_distance
+
     corrected_elements = []
 
     for elem in text_elements:
         if is_splice_point(elem.content):
-            # Find nearest dot
+            # Find nearest dot (earliest dot wins ties, as in a linear scan)
             nearest_dot = None
-            min_dist = float('inf')
-
-            for dot_x, dot_y in dots:
-                dist = math.sqrt((elem.x - dot_x)**2 + (elem.y - dot_y)**2)
-                if dist < max_distance and dist < min_dist:
-                    min_dist = dist
+            best = None  # (squared distance, dot index)
+
+            lo = bisect_left(sorted_xs, elem.x - max_distance)
+            hi = bisect_right(sorted_xs, elem.x + max_distance)
+            for dot_x, i, dot_y in sorted_dots[lo:hi]:
+                dx = elem.x - dot_x
+                dy = elem.y - dot_y
+                dist_sq = dx * dx + dy * dy
+                if dist_sq < max_distance_sq and (best is None or (dist_sq, i) < best):
+                    best = (dist_sq, i)
                     nearest_dot = (dot_x, dot_y)
 
             if nearest_dot:
@@ -713,20 +764,25 @@ def generate_ids_for_unlabeled_splices(
     """
     from connector_finder import is_splice_point
 
-    # Collect all labeled splice positions (after map_splice_positions_to_dots)
-    labeled_positions = []
-    for elem in text_elements:
-        if is_splice_point(elem.content):
-            labeled_positions.append((elem.x, elem.y))
+    # Collect all labeled splice positions (after map_splice_positions_to_dots),
+    # sorted by X so each dot only checks labels within max_distance in X
+    labeled_positions = sorted(
+        (elem.x, elem.y) for elem in text_elements if is_splice_point(elem.content)
+    )
+    labeled_xs = [label_x for label_x, _ in labeled_positions]
 
     # Find unlabeled dots
     unlabeled_dots = []
+    max_distance_sq = max_distance * max_distance  # Compare squared distances
     for dot_x, dot_y in dots:
         # Check if this dot has a label positioned on or very near it
         has_label = False
-        for label_x, label_y in labeled_positions:
-            dist = math.sqrt((dot_x - label_x)**2 + (dot_y - label_y)**2)
-            if dist < max_distance:
+        lo = bisect_left(labeled_xs, dot_x - max_distance)
+        hi = bisect_right(labeled_xs, dot_x + max_distance)
+        for label_x, label_y in labeled_positions[lo:hi]:
+            dx = dot_x - label_x
+            dy = dot_y - label_y
+            if dx * dx + dy * dy < max_distance_sq:
                 has_label = True
                 break
 
@@ -743,7 +799,7 @@ def generate_ids_for_unlabeled_splices(
     return result
 
 
-def parse_horizontal_colored_wires(svg_file: str) -> List['HorizontalWireSegment']:
+def parse_horizontal_colored_wires(svg_file: SvgSource) -> List['HorizontalWireSegment']:
     """
     Parse horizontal colored wire segments from SVG.
 
@@ -751,15 +807,14 @@ def parse_horizontal_colored_wires(svg_file: str) -> List['HorizontalWireSegment
     (st8-st31) and represent horizontal routing wires in grid-based diagrams.
 
     Args:
-        svg_file: Path to SVG file
+        svg_file: Path to SVG file, or root element from parse_svg_once()
 
     Returns:
         List of HorizontalWireSegment objects
     """
     from models import HorizontalWireSegment
 
-    tree = ET.parse(svg_file)
-    root = tree.getroot()
+    root = _svg_root(svg_file)
 
     # CSS class to standard wire color code mapping
     COLOR_MAP = {
@@ -815,7 +870,7 @@ def parse_horizontal_colored_wires(svg_file: str) -> List['HorizontalWireSegment
 
             # Extract horizontal paths
             # Format: M x,y c dx,dy,... or M x,y H x2 or M x,y h dx
-            match_m = re.match(r'M([\d.]+),([\d.]+)', d)
+            match_m = _RE_MOVE_TO.match(d)
             if not match_m:
                 continue
 
@@ -823,7 +878,7 @@ def parse_horizontal_colored_wires(svg_file: str) -> List['HorizontalWireSegment
             y1 = float(match_m.group(2))
 
             # Check for horizontal command (H or h)
-            match_h = re.search(r'[Hh]([\d.]+)', d)
+            match_h = _RE_HORIZONTAL_TO.search(d)
             if match_h:
                 if 'H' in d:  # Absolute
                     x2 = float(match_h.group(1))
@@ -842,7 +897,7 @@ def parse_horizontal_colored_wires(svg_file: str) -> List['HorizontalWireSegment
             # Pattern: M x,y c dx,0,dx2,0,dx3,0
             elif 'c' in d.lower():
                 # Extract the 'c' command parameters
-                match_c = re.search(r'c([\d.,\s]+)', d)
+                match_c = _RE_CURVE_ARGS.search(d)
                 if match_c:
                     params = match_c.group(1).replace(',', ' ').split()
                     if len(params) >= 6:
@@ -864,7 +919,7 @@ def parse_horizontal_colored_wires(svg_file: str) -> List['HorizontalWireSegment
     return segments
 
 
-def parse_vertical_dashed_wires(svg_file: str) -> List['VerticalWireSegment']:
+def parse_vertical_dashed_wires(svg_file: SvgSource) -> List['VerticalWireSegment']:
     """
     Parse vertical dashed wire segments from SVG.
 
@@ -872,15 +927,14 @@ def parse_vertical_dashed_wires(svg_file: str) -> List['VerticalWireSegment']:
     and represent vertical routing wires in grid-based diagrams.
 
     Args:
-        svg_file: Path to SVG file
+        svg_file: Path to SVG file, or root element from parse_svg_once()
 
     Returns:
         List of VerticalWireSegment objects
     """
     from models import VerticalWireSegment
 
-    tree = ET.parse(svg_file)
-    root = tree.getroot()
+    root = _svg_root(svg_file)
 
     segments = []
 
@@ -896,7 +950,7 @@ def parse_vertical_dashed_wires(svg_file: str) -> List['VerticalWireSegment']:
 
         # Extract vertical paths
         # Format: M x,y c 0,dy1,0,dy2,0,dy
-        match_m = re.match(r'M([\d.]+),([\d.]+)', d)
+        match_m = _RE_MOVE_TO.match(d)
         if not match_m:
             continue
 
@@ -905,7 +959,7 @@ def parse_vertical_dashed_wires(svg_file: str) -> List['VerticalWireSegment']:
 
         # Check for cubic bezier vertical path (c 0,dy,...)
         # Pattern: M x,y c 0,dy1,0,dy2,0,dy
-        match_c = re.search(r'c([\d.,\s]+)', d)
+        match_c = _RE_CURVE_ARGS.search(d)
         if match_c:
             params = match_c.group(1).replace(',', ' ').split()
             if len(params) >= 6:
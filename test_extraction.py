@@ -45,6 +45,7 @@ import sys
 from typing import List, Set, Tuple
 from models import Connection, IDGenerator
 from svg_parser import (
+    parse_svg_once,
     parse_text_elements,
     parse_splice_dots,
     parse_st17_polylines,
@@ -56,6 +57,7 @@ from svg_parser import (
     map_splice_positions_to_dots,
     generate_ids_for_unlabeled_splices
 )
+from connector_finder import TextIndex
 from extractors import (
     HorizontalWireExtractor,
     VerticalRoutingExtractor,
@@ -92,16 +94,17 @@ class ExtractionTester:
         # Initialize ID generator
         id_generator = IDGenerator()
 
-        # Parse SVG
-        text_elements = parse_text_elements(svg_file)
-        splice_dots = parse_splice_dots(svg_file)
-        all_polylines = parse_all_polylines(svg_file)  # Use all polylines for routing
-        st17_paths = parse_st17_paths(svg_file)
-        st1_paths = parse_st1_paths(svg_file)
+        # Parse SVG (once; every parser walks the same tree)
+        svg_root = parse_svg_once(svg_file)
+        text_elements = parse_text_elements(svg_root)
+        splice_dots = parse_splice_dots(svg_root)
+        all_polylines = parse_all_polylines(svg_root)  # Use all polylines for routing
+        st17_paths = parse_st17_paths(svg_root)
+        st1_paths = parse_st1_paths(svg_root)
         # Parse st0 without filter (horizontal segments for multi-path connections)
         # Parse st3/st4 with filter (only L-shaped to avoid duplicates)
-        st0_paths = parse_routing_paths(svg_file, path_classes=['st0'], only_l_shaped=False)
-        st3_st4_paths = parse_routing_paths(svg_file, path_classes=['st3', 'st4'], only_l_shaped=True)
+        st0_paths = parse_routing_paths(svg_root, path_classes=['st0'], only_l_shaped=False)
+        st3_st4_paths = parse_routing_paths(svg_root, path_classes=['st3', 'st4'], only_l_shaped=True)
         routing_paths = st0_paths + st3_st4_paths
 
         # Map splice positions
@@ -112,17 +115,18 @@ class ExtractionTester:
 
         # Extract wire specs
         wire_specs = extract_wire_specs(text_elements)
+        labels = TextIndex(text_elements)  # Shared by all extractors
 
         # Run extractors
-        horizontal_extractor = HorizontalWireExtractor(text_elements, wire_specs, all_polylines)
+        horizontal_extractor = HorizontalWireExtractor(text_elements, wire_specs, all_polylines, labels=labels)
         horizontal_connections = horizontal_extractor.extract_connections()
 
         # Combine st1 and st3/st4 routing paths
         all_routing_paths = st1_paths + routing_paths
-        vertical_extractor = VerticalRoutingExtractor(all_polylines, all_routing_paths, text_elements, wire_specs, horizontal_connections)
+        vertical_extractor = VerticalRoutingExtractor(all_polylines, all_routing_paths, text_elements, wire_specs, horizontal_connections, labels=labels)
         vertical_connections = vertical_extractor.extract_connections()
 
-        ground_extractor = GroundConnectionExtractor(st17_paths, text_elements, wire_specs, horizontal_connections)
+        ground_extractor = GroundConnectionExtractor(st17_paths, text_elements, wire_specs, horizontal_connections, labels=labels)
         ground_connections = ground_extractor.extract_connections()
 
         # Combine and deduplicate globally